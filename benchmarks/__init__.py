@@ -0,0 +1 @@
+"""Offline benchmarks and load-testing helpers for the bonus bet bot"""
@@ -0,0 +1,126 @@
+"""Deterministic synthetic Odds API payloads.
+
+The same seed and parameters always produce the same payloads, so benchmark
+numbers are comparable across commits. Shapes follow the /v4/sports and
+/v4/sports/{sport}/odds responses the bot consumes.
+"""
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# Real sport keys first so the bot's priority/exclusion filters behave as in production
+SPORTS = [
+    ('aussierules_afl', 'AFL', 'Aussie Rules'),
+    ('rugbyleague_nrl', 'NRL', 'Rugby League'),
+    ('basketball_nba', 'NBA', 'Basketball'),
+    ('cricket_big_bash', 'Big Bash', 'Cricket'),
+    ('americanfootball_nfl', 'NFL', 'American Football'),
+    ('icehockey_nhl', 'NHL', 'Ice Hockey'),
+    ('basketball_nbl', 'NBL', 'Basketball'),
+    ('rugbyunion_super_rugby', 'Super Rugby', 'Rugby Union'),
+    ('mma_mixed_martial_arts', 'MMA', 'Mixed Martial Arts'),
+    ('tennis_atp_aus_open', 'ATP Australian Open', 'Tennis'),
+    ('basketball_euroleague', 'Basketball Euroleague', 'Basketball'),
+    ('cricket_test_match', 'Test Matches', 'Cricket'),
+    ('baseball_mlb', 'MLB', 'Baseball'),
+    ('soccer_epl', 'EPL', 'Soccer'),
+]
+
+BOOKMAKERS = [
+    'sportsbet', 'tab', 'pointsbetau', 'ladbrokes_au', 'neds', 'unibet',
+    'betright', 'betr_au', 'bet365_au', 'betfair_ex_au', 'playup', 'boombet', 'tabtouch'
+]
+
+MARKETS = ['h2h', 'spreads', 'totals']
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def generate_sports(count: int = 12) -> List[Dict]:
+    """Sports list payload with count active sports (plus excluded ones for the filters)"""
+    sports = []
+    for i in range(count):
+        key, title, group = SPORTS[i % len(SPORTS)]
+        if i >= len(SPORTS):
+            key, title = f'{key}_{i}', f'{title} {i}'
+        sports.append({
+            'key': key,
+            'group': group,
+            'title': title,
+            'description': f'{title} fixtures',
+            'active': True,
+            'has_outrights': False,
+        })
+    return sports
+
+def _two_way_prices(rng: random.Random, p: float, margin: float) -> tuple:
+    """A pair of decimal prices for the event's true probability p, with a bookmaker
+    margin and a little per-bookmaker noise (bookmakers disagree, but only slightly)
+    """
+    p = min(max(p * rng.uniform(0.98, 1.02), 0.05), 0.95)
+    first = round(1 / (p * (1 + margin)), 2)
+    second = round(1 / ((1 - p) * (1 + margin)), 2)
+    return max(first, 1.01), max(second, 1.01)
+
+def generate_odds(sport_key: str, events: int = 20, bookmakers: int = 13, markets: Optional[List[str]] = None,
+                  seed: int = 0, now: Optional[datetime] = None, revision: int = 0) -> List[Dict]:
+    """Odds payload for one sport.
+
+    revision re-prices roughly one event in ten (bumping its bookmakers'
+    last_update), which models a typical refresh where few prices move.
+    """
+    markets = markets or MARKETS
+    now = now or datetime.now(timezone.utc).replace(microsecond=0)
+    sport_title = next((title for key, title, _ in SPORTS if sport_key.startswith(key)), sport_key)
+    rng = random.Random(f'{seed}:{sport_key}')
+    payload = []
+    
+    for e in range(events):
+        event_rng = random.Random(f'{seed}:{sport_key}:{e}')
+        changed = event_rng.random() < 0.1 and revision > 0
+        price_rng = random.Random(f'{seed}:{sport_key}:{e}:{revision if changed else 0}')
+        home, away = f'{sport_title} Home {e}', f'{sport_title} Away {e}'
+        commence = now + timedelta(hours=2 + e * 7 + rng.randint(0, 5))
+        last_update = _iso(now - timedelta(minutes=event_rng.randint(1, 30)) + timedelta(seconds=revision if changed else 0))
+        line = round(event_rng.uniform(1, 20)) + 0.5
+        total = round(event_rng.uniform(30, 220)) + 0.5
+        # One true probability per market, shared by every bookmaker (lines and
+        # totals are set near even money); a re-price nudges it
+        probabilities = {
+            market: event_rng.uniform(0.15, 0.85) if market == 'h2h' else event_rng.uniform(0.45, 0.55)
+            for market in MARKETS
+        }
+        if changed:
+            probabilities = {market: p * price_rng.uniform(0.95, 1.05) for market, p in probabilities.items()}
+        
+        event_bookmakers = []
+        for key in BOOKMAKERS[:bookmakers]:
+            margin = price_rng.uniform(0.04, 0.10)
+            event_markets = []
+            for market in markets:
+                first, second = _two_way_prices(price_rng, probabilities[market], margin)
+                if market == 'h2h':
+                    outcomes = [{'name': home, 'price': first}, {'name': away, 'price': second}]
+                elif market == 'spreads':
+                    outcomes = [{'name': home, 'price': first, 'point': -line}, {'name': away, 'price': second, 'point': line}]
+                else:
+                    outcomes = [{'name': 'Over', 'price': first, 'point': total}, {'name': 'Under', 'price': second, 'point': total}]
+                event_markets.append({'key': market, 'last_update': last_update, 'outcomes': outcomes})
+            event_bookmakers.append({
+                'key': key,
+                'title': key.replace('_', ' ').title(),
+                'last_update': last_update,
+                'markets': event_markets,
+            })
+        
+        payload.append({
+            'id': hashlib.md5(f'{sport_key}:{e}'.encode()).hexdigest(),
+            'sport_key': sport_key,
+            'sport_title': sport_title,
+            'commence_time': _iso(commence),
+            'home_team': home,
+            'away_team': away,
+            'bookmakers': event_bookmakers,
+        })
+    return payload
@@ -0,0 +1,193 @@
+"""Local stand-in for The Odds API, for load testing without spending credits.
+
+Implements GET /v4/sports and GET /v4/sports/{sport}/odds with the query
+parameters the bot sends (apiKey, regions, markets, oddsFormat, bookmakers),
+returns x-requests-* usage headers, and can inject latency, timeouts, error
+statuses and rate limiting. Point the bot at it with:
+
+    python -m benchmarks.odds_api_stub --port 8080 --latency-ms 150 --fail 500:0.02,422:0.05
+    ODDS_API_BASE=http://127.0.0.1:8080/v4 python bonusbet.py
+
+GET /stats reports requests, credits and injected faults so far.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from benchmarks import fixtures
+
+class StubConfig:
+    def __init__(self, args):
+        self.sports = args.sports
+        self.events = args.events
+        self.seed = args.seed
+        self.record_dir = args.record_dir
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.timeout_rate = args.timeout_rate
+        self.timeout_delay = args.timeout_delay
+        self.failures = parse_failures(args.fail)
+        self.rate_limit = args.rate_limit
+        self.quota = args.quota
+        self.move_interval = args.move_interval
+
+def parse_failures(spec: str) -> Dict[int, float]:
+    """'500:0.05,422:0.1' -> {500: 0.05, 422: 0.1}"""
+    failures = {}
+    for part in filter(None, (spec or '').split(',')):
+        status, rate = part.split(':')
+        failures[int(status)] = float(rate)
+    return failures
+
+class OddsApiStub:
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.started = time.monotonic()
+        self.window_start = self.started
+        self.window_requests = 0
+        self.stats = {'requests': 0, 'credits_used': 0, 'timeouts': 0, 'rate_limited': 0, 'injected': {}}
+        self.sports = self._load_recorded('sports') or fixtures.generate_sports(config.sports)
+        self.recorded_odds = {}
+
+    def _load_recorded(self, name: str) -> Optional[list]:
+        if not self.config.record_dir:
+            return None
+        path = os.path.join(self.config.record_dir, f'{name}.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def usage_headers(self, last: int) -> Dict[str, str]:
+        return {
+            'x-requests-remaining': str(max(self.config.quota - self.stats['credits_used'], 0)),
+            'x-requests-used': str(self.stats['credits_used']),
+            'x-requests-last': str(last),
+        }
+
+    def error(self, status: int, message: str, last: int = 0) -> web.Response:
+        return web.json_response({'message': message, 'error_code': str(status)}, status=status, headers=self.usage_headers(last))
+
+    async def before_request(self, request: web.Request) -> Optional[web.Response]:
+        """Latency, rate limiting, auth and fault injection shared by every endpoint"""
+        self.stats['requests'] += 1
+        config = self.config
+
+        if config.rate_limit:
+            now = time.monotonic()
+            if now - self.window_start >= 1:
+                self.window_start, self.window_requests = now, 0
+            self.window_requests += 1
+            if self.window_requests > config.rate_limit:
+                self.stats['rate_limited'] += 1
+                return self.error(429, 'Rate limit exceeded')
+
+        delay = config.latency + self.rng.uniform(-config.jitter, config.jitter)
+        if config.timeout_rate and self.rng.random() < config.timeout_rate:
+            self.stats['timeouts'] += 1
+            delay = config.timeout_delay
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if not request.query.get('apiKey'):
+            return self.error(401, 'API key is missing')
+        for status, rate in config.failures.items():
+            if self.rng.random() < rate:
+                self.stats['injected'][status] = self.stats['injected'].get(status, 0) + 1
+                return self.error(status, f'Injected HTTP {status}')
+        return None
+
+    async def handle_sports(self, request: web.Request) -> web.Response:
+        failure = await self.before_request(request)
+        if failure:
+            return failure
+        # The sports endpoint doesn't cost credits
+        return web.json_response(self.sports, headers=self.usage_headers(0))
+
+    async def handle_odds(self, request: web.Request) -> web.Response:
+        failure = await self.before_request(request)
+        if failure:
+            return failure
+
+        sport_key = request.match_info['sport']
+        markets = [m for m in request.query.get('markets', 'h2h').split(',') if m]
+        regions = [r for r in request.query.get('regions', '').split(',') if r]
+        if not regions:
+            return self.error(422, 'Missing regions')
+        unknown = [m for m in markets if m not in fixtures.MARKETS]
+        if unknown:
+            return self.error(422, f'Invalid markets: {",".join(unknown)}')
+        if not any(sport['key'] == sport_key for sport in self.sports):
+            return self.error(404, 'Unknown sport')
+
+        cost = len(markets) * len(regions)
+        if self.stats['credits_used'] + cost > self.config.quota:
+            return self.error(401, 'Usage quota has been reached')
+        self.stats['credits_used'] += cost
+
+        events = self.odds_payload(sport_key, markets)
+        wanted = set(filter(None, request.query.get('bookmakers', '').split(',')))
+        if wanted:
+            events = [
+                {**event, 'bookmakers': [b for b in event['bookmakers'] if b['key'] in wanted]}
+                for event in events
+            ]
+        return web.json_response(events, headers=self.usage_headers(cost))
+
+    def odds_payload(self, sport_key: str, markets: list) -> list:
+        recorded = self.recorded_odds.get(sport_key)
+        if recorded is None and self.config.record_dir:
+            recorded = self.recorded_odds[sport_key] = self._load_recorded(sport_key) or []
+        if recorded:
+            return [
+                {**event, 'bookmakers': [
+                    {**b, 'markets': [m for m in b['markets'] if m['key'] in markets]} for b in event['bookmakers']
+                ]}
+                for event in recorded
+            ]
+        revision = int((time.monotonic() - self.started) // self.config.move_interval) if self.config.move_interval else 0
+        return fixtures.generate_odds(sport_key, events=self.config.events, markets=markets, seed=self.config.seed, revision=revision)
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.stats, 'uptime': round(time.monotonic() - self.started, 1)})
+
+def make_app(config: StubConfig) -> web.Application:
+    stub = OddsApiStub(config)
+    app = web.Application()
+    app['stub'] = stub
+    app.router.add_get('/v4/sports', stub.handle_sports)
+    app.router.add_get('/v4/sports/', stub.handle_sports)
+    app.router.add_get('/v4/sports/{sport}/odds', stub.handle_odds)
+    app.router.add_get('/v4/sports/{sport}/odds/', stub.handle_odds)
+    app.router.add_get('/stats', stub.handle_stats)
+    return app
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--sports', type=int, default=10, help='generated sports')
+    parser.add_argument('--events', type=int, default=20, help='generated events per sport')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record-dir', help='serve recorded payloads (sports.json, <sport_key>.json) instead of generated ones')
+    parser.add_argument('--latency-ms', type=float, default=0, help='added latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='+/- random latency')
+    parser.add_argument('--timeout-rate', type=float, default=0, help='fraction of requests that stall')
+    parser.add_argument('--timeout-delay', type=float, default=15, help='seconds a stalled request hangs (the bot gives up after 10)')
+    parser.add_argument('--fail', default='', help='injected statuses, e.g. 401:0.01,422:0.05,500:0.02')
+    parser.add_argument('--rate-limit', type=int, default=0, help='requests per second before answering 429 (0 = unlimited)')
+    parser.add_argument('--quota', type=int, default=20000, help='credits before the stub answers 401')
+    parser.add_argument('--move-interval', type=float, default=300, help='seconds between price moves (0 = never)')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    print(f"Odds API stub on http://{args.host}:{args.port}/v4 - set ODDS_API_BASE to that URL")
+    web.run_app(make_app(StubConfig(args)), host=args.host, port=args.port, print=None)
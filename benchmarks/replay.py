@@ -0,0 +1,215 @@
+"""Replay recorded odds history through extraction and queue matching.
+
+Record history by running the bot with HISTORY_PATH set, then replay it at
+one or more polling cadences to see what each would have cost and caught:
+
+    HISTORY_PATH=bonusbet_history.bin python bonusbet.py
+    python -m benchmarks.replay bonusbet_history.bin --interval 300 900 1800 --threshold 0.6
+    python -m benchmarks.replay /tmp/history.bin --generate --hours 24   # synthetic history first
+
+Each cadence is compared against a replay of every recorded fetch. The
+comparison reports how many threshold-clearing opportunities the slower
+polling never saw, how often the quick-mode threshold is met per bookmaker,
+and how quickly simulated queued searches would have been matched. Replay
+runs the bot's own update_sport_extraction / OpportunitySnapshot code in
+simulated time, so it is far faster than real time and spends no credits.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+# Keep replays away from the bot's on-disk cache, queue and history
+os.environ['CACHE_DB_PATH'] = ''
+os.environ['QUEUE_DB_PATH'] = ''
+os.environ['HISTORY_PATH'] = ''
+
+import bonusbet
+from benchmarks import fixtures
+
+def generate_history(path: str, hours: float, interval: float, sports: int, events: int, seed: int):
+    """Write a synthetic history: every sport re-fetched every interval seconds over hours"""
+    store = bonusbet.HistoryStore(path)
+    trimmer = bonusbet.ArbitrageBot()
+    start = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=hours)
+    ticks = int(hours * 3600 // interval)
+    for tick in range(ticks):
+        fetched_at = start + timedelta(seconds=tick * interval)
+        for sport in fixtures.generate_sports(sports):
+            payload = fixtures.generate_odds(sport['key'], events=events, seed=seed, now=start, revision=tick)
+            trimmed = [event for event in (trimmer.trim_event(event, fetched_at) for event in payload) if event]
+            store.append(fetched_at.timestamp(), sport['key'], sport['title'], trimmed)
+    print(f"Wrote {ticks} fetches of {sports} sports to {path}")
+
+def opportunity_key(opp: bonusbet.Opportunity) -> tuple:
+    return (opp.event.event_id, opp.market_type, opp.bonus_bookmaker, opp.bonus_outcome, opp.hedge_bookmaker)
+
+def synthetic_searches(count: int, start: float, end: float, bookmakers: list, seed: int) -> list:
+    """(arrival time, bookmaker, amount, mode) for count searches spread over the history"""
+    rng = random.Random(seed)
+    return sorted(
+        (rng.uniform(start, end), rng.choice(bookmakers), rng.choice([25, 50, 100, 250, 500]), rng.choice(['quick', 'best']))
+        for _ in range(count)
+    )
+
+class Replay:
+    """Recorded fetches from a HistoryStore, replayable at any polling cadence"""
+    def __init__(self, path: str, sports: list = None):
+        self.store = bonusbet.HistoryStore(path)
+        self.view = self.store.open()
+        if self.view is None:
+            raise SystemExit(f"No history recorded at {path}")
+        records = self.store.scan(self.view)
+        if sports:
+            records = [record for record in records if record[1] in sports]
+        if not records:
+            raise SystemExit(f"No matching records in {path}")
+        self.records = sorted(records)
+        self.start = self.records[0][0]
+        self.end = self.records[-1][0]
+        self.sport_titles = {record[1]: record[2] for record in self.records}
+
+    def ticks(self, interval: float) -> list:
+        """Polling times: every recorded fetch for interval 0, else every interval seconds"""
+        if not interval:
+            return sorted({record[0] for record in self.records})
+        count = int((self.end - self.start) // interval) + 1
+        return [self.start + i * interval for i in range(count)]
+
+    async def run(self, interval: float, threshold: float, searches: list, workers: int = 0) -> dict:
+        arb = bonusbet.ArbitrageBot()
+        arb.extractor = bonusbet.ExtractionPool(workers)
+        queue = bonusbet.SearchQueue()
+        snapshot = bonusbet.OpportunitySnapshot([])
+        latest = {}        # sport_key -> (record index, decoded events) visible at the current tick
+        next_record = 0
+        next_search = 0
+        seen = set()       # Threshold-clearing opportunities observed at this cadence
+        head_hits = {}     # bookmaker -> [ticks with a threshold-clearing head, ticks with any opportunity]
+        waits = []
+        fetches = 0
+        started = time.perf_counter()
+
+        for tick in self.ticks(interval):
+            now_aware = datetime.fromtimestamp(tick, timezone.utc)
+
+            # Every record fetched by now is visible; only the newest per sport matters
+            while next_record < len(self.records) and self.records[next_record][0] <= tick:
+                latest[self.records[next_record][1]] = (next_record, None)
+                next_record += 1
+
+            removed_events, added = set(), []
+            for sport_key, (index, events) in latest.items():
+                if events is None:
+                    _, _, _, offset, length = self.records[index]
+                    events = self.store.events(self.view, offset, length)
+                    latest[sport_key] = (index, events)
+                fetches += 1
+                sport_removed, sport_added, state = await arb.update_sport_extraction(
+                    sport_key, self.sport_titles[sport_key], events, now_aware
+                )
+                arb.sport_extractions[sport_key] = state
+                removed_events |= sport_removed
+                added.extend(sport_added)
+            snapshot = snapshot.patched(removed_events, added, snapshot.version + 1)
+            # Opportunities still in the snapshot were seen when they were added
+            seen.update(opportunity_key(opp) for opp in added if opp.return_ratio >= threshold)
+
+            for bookmaker, ranked in snapshot.by_bookmaker.items():
+                head = next((opp for opp in ranked if opp.event.commence_time > now_aware), None)
+                counts = head_hits.setdefault(bookmaker, [0, 0])
+                if head is not None:
+                    counts[1] += 1
+                    counts[0] += head.return_ratio >= threshold
+
+            # Queue searches that have arrived, expire old ones, then match
+            while next_search < len(searches) and searches[next_search][0] <= tick:
+                arrival, bookmaker, amount, mode = searches[next_search]
+                added_at = datetime.fromtimestamp(arrival, timezone.utc)
+                queue.add({
+                    'bookmaker': bookmaker, 'amount': amount, 'search_mode': mode,
+                    'added_at': added_at, 'expires_at': added_at + bonusbet.SEARCH_QUEUE_TTL,
+                })
+                next_search += 1
+            queue.pop_expired(now_aware)
+            for bookmaker, bucket in list(queue.buckets.items()):
+                pending = list(bucket.values())
+                picks = snapshot.select_batch(
+                    bookmaker, [search['amount'] for search in pending], [search['search_mode'] for search in pending], tick
+                )
+                for search, pick in zip(pending, picks):
+                    if pick is not None:
+                        queue.remove(search)
+                        waits.append(tick - search['added_at'].timestamp())
+
+        arb.extractor.shutdown()
+        return {
+            'interval': interval,
+            'ticks': len(self.ticks(interval)),
+            'fetches': fetches,
+            'seen': seen,
+            'head_hits': head_hits,
+            'matched': len(waits),
+            'unmatched': len(searches) - len(waits),
+            'median_wait': statistics.median(waits) if waits else None,
+            'replay_seconds': time.perf_counter() - started,
+        }
+
+def print_result(result: dict, baseline: dict, span: float):
+    missed = len(baseline['seen'] - result['seen'])
+    total = len(baseline['seen']) or 1
+    hits = sum(counts[0] for counts in result['head_hits'].values())
+    chances = sum(counts[1] for counts in result['head_hits'].values()) or 1
+    wait = f"{result['median_wait'] / 60:.1f}min" if result['median_wait'] is not None else 'n/a'
+    label = 'every fetch' if not result['interval'] else f"{result['interval']:.0f}s"
+    print(
+        f"  {label:>12}  polls {result['ticks']:>5}  sport fetches {result['fetches']:>6}  "
+        f"quick threshold met {hits / chances:6.1%}  missed {missed:>5} ({missed / total:5.1%})  "
+        f"matched {result['matched']:>4} (median wait {wait})  "
+        f"replayed in {result['replay_seconds']:.1f}s ({span / max(result['replay_seconds'], 1e-9):,.0f}x real time)"
+    )
+
+async def main(args):
+    if args.generate:
+        generate_history(args.path, args.hours, args.record_interval, args.sports, args.events, args.seed)
+
+    bonusbet.QUICK_RETURN_THRESHOLD = args.threshold
+    replay = Replay(args.path, args.sport)
+    span = replay.end - replay.start
+    bookmakers = list(bonusbet.SUPPORTED_BOOKMAKERS)
+    searches = synthetic_searches(args.searches, replay.start, replay.end, bookmakers, args.seed)
+    print(f"{len(replay.records)} recorded fetches of {len(replay.sport_titles)} sports over {span / 3600:.1f}h, "
+          f"threshold {args.threshold:.0%}, {len(searches)} simulated searches")
+
+    baseline = await replay.run(0, args.threshold, searches, args.workers)
+    print_result(baseline, baseline, span)
+    for interval in args.interval:
+        print_result(await replay.run(interval, args.threshold, searches, args.workers), baseline, span)
+
+    if args.per_bookmaker:
+        print("\nQuick threshold met per bookmaker (every fetch):")
+        for bookmaker, (hits, chances) in sorted(baseline['head_hits'].items()):
+            print(f"  {bookmaker:<14} {hits / chances if chances else 0:6.1%}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', nargs='?', default='bonusbet_history.bin', help='history file (HISTORY_PATH)')
+    parser.add_argument('--interval', type=float, nargs='*', default=[300, 900, 1800], help='polling cadences to compare (seconds)')
+    parser.add_argument('--threshold', type=float, default=bonusbet.QUICK_RETURN_THRESHOLD, help='quick-mode return threshold')
+    parser.add_argument('--sport', action='append', help='only replay these sport keys (repeatable)')
+    parser.add_argument('--searches', type=int, default=500, help='simulated queued searches spread over the history')
+    parser.add_argument('--per-bookmaker', action='store_true', help='show the threshold hit rate per bookmaker')
+    parser.add_argument('--workers', type=int, default=0, help='extraction worker processes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--generate', action='store_true', help='write a synthetic history to path first')
+    parser.add_argument('--hours', type=float, default=24, help='synthetic history length')
+    parser.add_argument('--record-interval', type=float, default=300, help='synthetic fetch interval (seconds)')
+    parser.add_argument('--sports', type=int, default=10, help='synthetic sports')
+    parser.add_argument('--events', type=int, default=20, help='synthetic events per sport')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,286 @@
+"""Offline benchmark suite for extraction, per-search lookup and queue processing.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run                      # default slate
+    python -m benchmarks.run --sports 10 --events 40 --users 500
+    python -m benchmarks.run --compare            # diff against the last run with the same parameters
+
+The Odds API is replaced by an in-process fake session serving
+benchmarks.fixtures payloads, and Discord user lookups/DMs are faked, so
+nothing touches the network. Each run is appended to benchmarks/results.jsonl
+together with the current git commit.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+# Keep benchmark runs away from the bot's on-disk cache and queue
+os.environ['CACHE_DB_PATH'] = ''
+os.environ['QUEUE_DB_PATH'] = ''
+os.environ.setdefault('ODDS_API_KEY', 'benchmark')
+
+import bonusbet
+from benchmarks import fixtures
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), 'results.jsonl')
+
+# Shared by every bot a run creates, so worker start-up isn't timed
+EXTRACTOR = bonusbet.ExtractionPool(0)
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+class FakeResponse:
+    def __init__(self, body: bytes, status: int = 200, headers=None):
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+        self.content = FakeContent(body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def text(self):
+        return self.body.decode('utf-8')
+
+    async def read(self):
+        return self.body
+
+class FakeOddsSession:
+    """Stands in for aiohttp.ClientSession, serving pre-encoded fixture payloads"""
+    closed = False
+
+    def __init__(self, sports_body: bytes, odds_bodies: dict):
+        self.sports_body = sports_body
+        self.odds_bodies = odds_bodies
+        self.requests = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        path = urlparse(url).path.rstrip('/')
+        headers = {'x-requests-remaining': '100000', 'x-requests-used': str(self.requests), 'x-requests-last': '3'}
+        if path.endswith('/sports'):
+            return FakeResponse(self.sports_body, headers=headers)
+        sport_key = path.split('/')[-2]
+        return FakeResponse(self.odds_bodies.get(sport_key, b'[]'), headers=headers)
+
+    async def close(self):
+        pass
+
+class FakeUser:
+    async def send(self, content=None, embed=None):
+        await asyncio.sleep(0)
+
+def build_slate(args, revision: int = 0) -> tuple:
+    """Encoded sports and per-sport odds payloads for the configured slate"""
+    sports = fixtures.generate_sports(args.sports)
+    odds = {
+        sport['key']: json.dumps(fixtures.generate_odds(
+            sport['key'], events=args.events, bookmakers=args.bookmakers, seed=args.seed, revision=revision
+        )).encode()
+        for sport in sports
+    }
+    return json.dumps(sports).encode(), odds
+
+def new_bot(sports_body: bytes, odds_bodies: dict) -> bonusbet.ArbitrageBot:
+    arb = bonusbet.ArbitrageBot()
+    arb.session = FakeOddsSession(sports_body, odds_bodies)
+    arb.request_limiter = bonusbet.RequestLimiter(len(odds_bodies) or 1, 0)
+    arb.extractor = EXTRACTOR
+    return arb
+
+def expire_odds(arb: bonusbet.ArbitrageBot):
+    """Force the next refresh to re-request every sport"""
+    for key in list(arb.cache.entries):
+        if key.startswith('odds_'):
+            arb.cache.expire(key)
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    """Swallow the bot's progress prints so they don't dominate the numbers"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+async def time_async(fn, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+async def bench_extraction(args) -> dict:
+    """Cold full refresh, unchanged-body refresh and a refresh where ~10% of events moved"""
+    sports_body, odds_bodies = build_slate(args)
+    _, moved_bodies = build_slate(args, revision=1)
+    results = {}
+
+    async def cold():
+        arb = new_bot(sports_body, odds_bodies)
+        await arb.fetch_all_opportunities_cached()
+    results['refresh_cold'] = await time_async(cold, args.repeat)
+
+    arb = new_bot(sports_body, odds_bodies)
+    await arb.fetch_all_opportunities_cached()
+
+    async def unchanged():
+        expire_odds(arb)
+        await arb.fetch_all_opportunities_cached()
+    results['refresh_unchanged'] = await time_async(unchanged, args.repeat)
+
+    bodies = [odds_bodies, moved_bodies]
+    flip = iter(range(1, 10 ** 9))
+    async def moved():
+        arb.session.odds_bodies = bodies[next(flip) % 2]
+        expire_odds(arb)
+        await arb.fetch_all_opportunities_cached()
+    results['refresh_10pct_moved'] = await time_async(moved, args.repeat)
+    results['opportunities'] = len(arb.snapshot)
+    return results
+
+async def bench_lookup(args) -> dict:
+    """Interactive find_opportunity_from_cache calls against one snapshot"""
+    sports_body, odds_bodies = build_slate(args)
+    arb = new_bot(sports_body, odds_bodies)
+    snapshot = await arb.fetch_all_opportunities_cached()
+    rng = random.Random(args.seed)
+    searches = [
+        (rng.choice(fixtures.BOOKMAKERS[:args.bookmakers]), rng.choice([25, 50, 100, 250, 500]), rng.choice(['quick', 'best']))
+        for _ in range(args.lookups)
+    ]
+
+    async def lookups():
+        for bookmaker, amount, mode in searches:
+            arb.find_opportunity_from_cache(snapshot, bookmaker, amount, mode)
+    timings = await time_async(lookups, args.repeat)
+    return {'lookup_per_search': [t / len(searches) for t in timings]}
+
+async def bench_queue(args) -> dict:
+    """One queue cycle (match N queued users and deliver their DMs) against a fresh snapshot"""
+    sports_body, odds_bodies = build_slate(args)
+    bonusbet.bot.get_user = lambda user_id: FakeUser()
+    rng = random.Random(args.seed)
+    timings = []
+
+    for _ in range(args.repeat):
+        arb = new_bot(sports_body, odds_bodies)
+        snapshot = await arb.fetch_all_opportunities_cached()
+        arb.notifier.start()
+        bonusbet.search_queue = bonusbet.SearchQueue()
+        for user_id in range(args.users):
+            await arb.add_to_queue(
+                user_id, f'<@{user_id}>', rng.choice([25, 50, 100, 250, 500]),
+                rng.choice(fixtures.BOOKMAKERS[:args.bookmakers]), rng.choice(['quick', 'best']), None
+            )
+
+        start = time.perf_counter()
+        async with bonusbet.queue_lock:
+            matches = arb.match_queue(snapshot)
+        for search, opportunity in matches:
+            arb.notify_match(search, opportunity)
+        await arb.notifier.jobs.join()
+        timings.append(time.perf_counter() - start)
+
+        for worker in arb.notifier.workers:
+            worker.cancel()
+    return {'queue_cycle': timings}
+
+def summarize(values: list) -> dict:
+    return {'min': min(values), 'median': statistics.median(values)}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def load_previous(params: dict) -> dict:
+    """Most recent stored run with the same parameters"""
+    if not os.path.exists(RESULTS_PATH):
+        return {}
+    previous = {}
+    with open(RESULTS_PATH, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('params') == params:
+                previous = record
+    return previous
+
+async def main(args) -> dict:
+    global EXTRACTOR
+    EXTRACTOR = bonusbet.ExtractionPool(args.workers)
+    if args.workers:
+        # Start the workers before anything is timed
+        await EXTRACTOR.run([('warmup', {})])
+    with quiet(not args.verbose):
+        results = {}
+        results.update(await bench_extraction(args))
+        results.update(await bench_lookup(args))
+        results.update(await bench_queue(args))
+
+    EXTRACTOR.shutdown()
+    opportunities = results.pop('opportunities')
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'params': {key: getattr(args, key) for key in ('sports', 'events', 'bookmakers', 'users', 'lookups', 'seed', 'workers')},
+        'opportunities': opportunities,
+        'results': {name: summarize(values) for name, values in results.items()},
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sports', type=int, default=10)
+    parser.add_argument('--events', type=int, default=20, help='events per sport')
+    parser.add_argument('--bookmakers', type=int, default=len(fixtures.BOOKMAKERS))
+    parser.add_argument('--users', type=int, default=300, help='queued searches for the queue cycle')
+    parser.add_argument('--lookups', type=int, default=1000, help='interactive searches per lookup timing')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=0, help='extraction worker processes (0 = inline, as before)')
+    parser.add_argument('--compare', action='store_true', help='show the change from the last run with the same parameters')
+    parser.add_argument('--no-save', action='store_true', help="don't append this run to results.jsonl")
+    parser.add_argument('--verbose', action='store_true', help="keep the bot's own log output")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    record = asyncio.run(main(args))
+    previous = load_previous(record['params']) if args.compare else {}
+
+    print(f"commit {record['commit']}  {record['opportunities']} opportunities  {record['params']}")
+    for name, stats in record['results'].items():
+        line = f"  {name:<22} min {stats['min'] * 1000:10.3f} ms   median {stats['median'] * 1000:10.3f} ms"
+        before = previous.get('results', {}).get(name)
+        if before:
+            change = (stats['median'] - before['median']) / before['median'] * 100
+            line += f"   ({change:+.1f}% vs {previous['commit']})"
+        print(line)
+
+    if not args.no_save:
+        with open(RESULTS_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
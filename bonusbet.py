@@ -1,31 +1,108 @@
 import discord
 from discord.ext import commands
 import aiohttp
+from aiohttp import web
+import numpy as np
+import bisect
+import calendar
+import codecs
+import hashlib
+import heapq
 import json
+import mmap
+import multiprocessing
 from datetime import datetime, timedelta
 import asyncio
 import os
+import random
+import re
+import sqlite3
+import struct
 import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from operator import attrgetter
 from typing import List, Dict, Optional
 
 # Force unbuffered output for Railway logs
 sys.stdout.reconfigure(line_buffering=True)
 sys.stderr.reconfigure(line_buffering=True)
 
+# Gateway sharding: set both to run several front-ends on one token, each
+# with a different SHARD_ID from 0 to SHARD_COUNT - 1 (unset = one unsharded session)
+SHARD_ID = int(os.getenv('SHARD_ID')) if os.getenv('SHARD_ID') else None
+SHARD_COUNT = int(os.getenv('SHARD_COUNT')) if os.getenv('SHARD_COUNT') else None
+
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = commands.Bot(command_prefix='!', intents=intents, shard_id=SHARD_ID, shard_count=SHARD_COUNT)
 
 # Configuration
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 ODDS_API_KEY = os.getenv('ODDS_API_KEY')
-ODDS_API_BASE = "https://api.the-odds-api.com/v4"
+ODDS_API_BASE = os.getenv('ODDS_API_BASE', "https://api.the-odds-api.com/v4")
 CHANNEL_ID = int(os.getenv('CHANNEL_ID', '0'))  # Set your channel ID
 
-# Queue for pending searches
-search_queue = []
-queue_lock = asyncio.Lock()
+# Odds API request limits (concurrent requests and requests per second)
+ODDS_MAX_CONCURRENT_REQUESTS = int(os.getenv('ODDS_MAX_CONCURRENT_REQUESTS', '4'))
+ODDS_REQUESTS_PER_SECOND = float(os.getenv('ODDS_REQUESTS_PER_SECOND', '5'))
+
+# Day of the month the Odds API credit quota resets
+ODDS_CREDIT_RESET_DAY = int(os.getenv('ODDS_CREDIT_RESET_DAY', '1'))
+
+# Concurrent DM senders for queue notifications
+NOTIFY_WORKERS = int(os.getenv('NOTIFY_WORKERS', '4'))
+
+# Interactive search admission: live searches running at once (more are queued
+# instead), and each user's burst and sustained searches per minute (0 = unlimited)
+SEARCH_MAX_LIVE = int(os.getenv('SEARCH_MAX_LIVE', '8'))
+SEARCH_BURST = int(os.getenv('SEARCH_BURST', '3'))
+SEARCH_RATE_PER_MINUTE = float(os.getenv('SEARCH_RATE_PER_MINUTE', '6'))
+
+# In-memory API response cache budget, and how long past expiry a cached
+# response may still be served when a refresh fails
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '256'))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+CACHE_STALE_SECONDS = float(os.getenv('CACHE_STALE_SECONDS', str(6 * 3600)))
+
+# On-disk API response cache (set to an empty string to disable)
+CACHE_DB_PATH = os.getenv('CACHE_DB_PATH', 'bonusbet_cache.db')
+
+# Durable search queue (set to an empty string to disable)
+QUEUE_DB_PATH = os.getenv('QUEUE_DB_PATH', 'bonusbet_queue.db')
+
+# Process role: 'all' (fetch and serve Discord), 'fetcher' (fetch odds and publish
+# snapshots to SNAPSHOT_PATH, no Discord) or 'frontend' (serve Discord from SNAPSHOT_PATH)
+BOT_ROLE = os.getenv('BOT_ROLE', 'all').lower()
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'bonusbet_snapshot.bin')
+
+# Append-only log of every odds response extracted from, for replay and
+# backtesting with benchmarks.replay (empty disables it)
+HISTORY_PATH = os.getenv('HISTORY_PATH', '')
+
+# Worker processes for opportunity extraction (0 = extract on the event loop).
+# Each worker re-imports the bot, so it only pays off for very large slates on multi-core hosts
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '0'))
+
+# Prometheus-style metrics endpoint (set METRICS_PORT=0 to disable)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+
+# Fraction of per-sport/per-message debug lines to print (0 = none, 1 = all)
+DEBUG_LOG_SAMPLE = float(os.getenv('DEBUG_LOG_SAMPLE', '0'))
+
+# Small JSON file for state that should survive restarts, such as the
+# interface message id (set to an empty string to disable)
+STATE_PATH = os.getenv('STATE_PATH', 'bonusbet_state.json')
+
+# How long a queued search keeps being retried before it expires
+SEARCH_QUEUE_TTL = timedelta(hours=24)
 
 # Market priority (higher number = higher priority)
 MARKET_PRIORITY = {
@@ -35,6 +112,25 @@ MARKET_PRIORITY = {
     'player_props': 2,
 }
 
+# Minimum guaranteed return (fraction of the bonus) accepted by 'quick' mode
+QUICK_RETURN_THRESHOLD = 0.60
+
+# Interactive searches that have to wait for a cold fetch answer with the best
+# found within SEARCH_DEADLINE seconds, editing the embed at most every
+# SEARCH_EDIT_INTERVAL seconds in the meantime (Discord rate-limits edits)
+SEARCH_DEADLINE = 10.0
+SEARCH_EDIT_INTERVAL = 1.5
+
+# Markets fetched for every sport, in one call per sport
+ODDS_MARKETS = 'h2h,spreads,totals'
+
+# Display names for the markets we extract
+MARKET_DISPLAY_NAMES = {
+    'h2h': 'Head to Head',
+    'spreads': 'Spread',
+    'totals': 'Totals',
+}
+
 # Supported Australian bookmakers
 # Note: bet365_au requires paid API subscription and only covers AFL/NRL
 SUPPORTED_BOOKMAKERS = [
@@ -68,6 +164,1208 @@ def is_boxing_sport(sport_key: str) -> bool:
     """Check if a sport key is boxing-related"""
     return sport_key in BOXING_SPORT_KEYS or sport_key.startswith('boxing_')
 
+# All soccer keywords compiled into one pattern, so a check is a single scan
+SOCCER_PATTERN = re.compile('|'.join(re.escape(keyword) for keyword in SOCCER_KEYWORDS), re.IGNORECASE)
+
+@lru_cache(maxsize=8192)
+def is_soccer_text(text: str) -> bool:
+    """Check if text contains soccer-related keywords (memoized per sport title / team name)"""
+    return SOCCER_PATTERN.search(text) is not None
+
+@lru_cache(maxsize=1024)
+def is_excluded_sport(sport_key: str, title: str) -> bool:
+    """Check if a sport is soccer, baseball or boxing (memoized per sport)"""
+    return is_baseball_sport(sport_key) or is_boxing_sport(sport_key) or is_soccer_text(title)
+
+@lru_cache(maxsize=8192)
+def parse_commence_time(commence_time: str) -> datetime:
+    """Parse an API commence_time; memoized so unchanged events aren't re-parsed every refresh"""
+    return datetime.fromisoformat(commence_time.replace('Z', '+00:00'))
+
+def build_price_index(bookmakers: List[Dict]) -> Dict[tuple, list]:
+    """Index an event's prices by (market, outcome name, point).
+
+    Each entry keeps the top two (price, bookmaker) pairs, which is enough to
+    answer "best price excluding one bookmaker" without rescanning the event.
+    """
+    index = {}
+    for bookmaker in bookmakers:
+        bookmaker_key = bookmaker['key']
+        for market in bookmaker.get('markets', []):
+            market_type = market['key']
+            for outcome in market.get('outcomes', []):
+                price = outcome['price']
+                key = (market_type, outcome['name'], outcome.get('point'))
+                top = index.get(key)
+                if top is None:
+                    index[key] = [(price, bookmaker_key)]
+                elif price > top[0][0]:
+                    top.insert(0, (price, bookmaker_key))
+                    del top[2:]
+                elif len(top) < 2 or price > top[1][0]:
+                    top[1:] = [(price, bookmaker_key)]
+    return index
+
+def best_hedge_price(price_index: Dict[tuple, list], key: tuple, exclude_bookmaker: str) -> tuple:
+    """Return (price, bookmaker) of the best price for key, ignoring exclude_bookmaker"""
+    for price, bookmaker_key in price_index.get(key, ()):
+        if bookmaker_key != exclude_bookmaker:
+            return price, bookmaker_key
+    return 0, None
+
+def debug_log(message: str):
+    """Print a per-iteration debug line, sampled by DEBUG_LOG_SAMPLE"""
+    if DEBUG_LOG_SAMPLE >= 1 or (DEBUG_LOG_SAMPLE > 0 and random.random() < DEBUG_LOG_SAMPLE):
+        print(message)
+
+class Metrics:
+    """In-process counters, gauges and histograms rendered as Prometheus text.
+
+    Metrics are declared once with describe(); label values are passed as
+    keyword arguments. Gauges can also be read at scrape time from a callback
+    returning a number or a {label_value: number} dict.
+    """
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600, 86400)
+    
+    def __init__(self, prefix: str = 'bonusbet'):
+        self.prefix = prefix
+        self.declared: Dict[str, tuple] = {}  # name -> (type, help, buckets, callback, callback label)
+        self.values: Dict[str, Dict[tuple, object]] = {}
+    
+    def describe(self, name: str, kind: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS, callback=None, label: str = ''):
+        self.declared[name] = (kind, help_text, tuple(buckets), callback, label)
+        self.values.setdefault(name, {})
+    
+    def inc(self, name: str, value: float = 1, **labels):
+        series = self.values[name]
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + value
+    
+    def set(self, name: str, value: float, **labels):
+        self.values[name][tuple(sorted(labels.items()))] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        series = self.values[name]
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            # [per-bucket counts (last is +Inf), sum, count]
+            histogram = series[key] = [[0] * (len(self.declared[name][2]) + 1), 0.0, 0]
+        histogram[0][bisect.bisect_left(self.declared[name][2], value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+    
+    def total(self, name: str, **labels) -> float:
+        """Sum of a counter (or a histogram's observation count) over series matching labels"""
+        wanted = set(labels.items())
+        total = 0
+        for key, value in self.values[name].items():
+            if wanted <= set(key):
+                total += value[2] if isinstance(value, list) else value
+        return total
+    
+    def mean(self, name: str) -> Optional[float]:
+        """Mean of every observation of a histogram, None if there are none"""
+        count = sum(histogram[2] for histogram in self.values[name].values())
+        return sum(histogram[1] for histogram in self.values[name].values()) / count if count else None
+    
+    @staticmethod
+    def _labels(key: tuple, extra: tuple = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+    
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_text, buckets, callback, label) in self.declared.items():
+            full_name = f'{self.prefix}_{name}'
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {kind}')
+            series = self.values[name]
+            if callback is not None:
+                try:
+                    value = callback()
+                except Exception:
+                    value = None
+                if isinstance(value, dict):
+                    series = {((label, key),): item for key, item in value.items()}
+                elif value is not None:
+                    series = {(): value}
+                else:
+                    series = {}
+            for key, value in series.items():
+                if kind != 'histogram':
+                    lines.append(f'{full_name}{self._labels(key)} {value}')
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    lines.append(f'{full_name}_bucket{self._labels(key, (("le", le),))} {cumulative}')
+                lines.append(f'{full_name}_sum{self._labels(key)} {total}')
+                lines.append(f'{full_name}_count{self._labels(key)} {count}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+metrics.describe('odds_fetch_seconds', 'histogram', 'Odds API request latency per sport')
+metrics.describe('odds_fetch_errors_total', 'counter', 'Failed odds fetches by sport and reason')
+metrics.describe('odds_cache_total', 'counter', 'get_odds lookups by result (hit, persisted, miss, stale)')
+metrics.describe('extraction_seconds', 'histogram', 'Opportunity extraction time per sport')
+metrics.describe('refresh_seconds', 'histogram', 'Full fetch-and-extract pass duration')
+metrics.describe('queue_match_seconds', 'histogram', 'Time from a search being queued to its match notification being delivered')
+metrics.describe('notification_delivery_seconds', 'histogram', 'Time from a notification being submitted to it being delivered')
+
+class RequestLimiter:
+    """Caps concurrent Odds API requests and spaces them to a requests-per-second limit"""
+    def __init__(self, max_concurrent: int, requests_per_second: float):
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.next_slot = 0.0
+    
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            if self.interval:
+                # Reserve the next send slot before sleeping so waiters queue up in order
+                now = time.monotonic()
+                slot = max(now, self.next_slot)
+                self.next_slot = slot + self.interval
+                if slot > now:
+                    await asyncio.sleep(slot - now)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+class SearchAdmission:
+    """Admission control for interactive searches.
+
+    Each user has a token bucket (burst tokens, refilled at per_minute), and at
+    most max_live searches run at once; beyond that searches are queued rather
+    than run live. A (user, bookmaker, mode) search that is already running is
+    reported as a duplicate instead of being started again.
+    """
+    def __init__(self, max_live: int, burst: int, per_minute: float):
+        self.max_live = max(1, max_live)
+        self.burst = max(1, burst)
+        self.refill = per_minute / 60 if per_minute > 0 else 0.0  # Tokens per second
+        self.buckets = {}  # user_id -> [tokens, updated_at]
+        self.live = set()  # (user_id, bookmaker, mode) searches running now
+        self.stats = {'live': 0, 'queued': 0, 'limited': 0, 'duplicate': 0}
+    
+    def _tokens(self, user_id: int, now: float) -> list:
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            if len(self.buckets) >= 4096:
+                # Forget users whose buckets have refilled; they'd start full anyway
+                self.buckets = {
+                    uid: b for uid, b in self.buckets.items()
+                    if b[0] + (now - b[1]) * self.refill < self.burst
+                }
+            bucket = self.buckets[user_id] = [float(self.burst), now]
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.refill)
+        bucket[1] = now
+        return bucket
+    
+    def retry_after(self, user_id: int) -> float:
+        """Seconds until the user can search again"""
+        if not self.refill:
+            return 0.0
+        tokens = self._tokens(user_id, time.monotonic())[0]
+        return max(0.0, (1 - tokens) / self.refill)
+    
+    def admit(self, key: tuple) -> str:
+        """'live' (run it, then release the key), 'queued' (too many live searches),
+        'limited' (user over their rate) or 'duplicate' (already running)
+        """
+        if key in self.live:
+            result = 'duplicate'
+        else:
+            bucket = self._tokens(key[0], time.monotonic()) if self.refill else None
+            if bucket is not None and bucket[0] < 1:
+                result = 'limited'
+            else:
+                if bucket is not None:
+                    bucket[0] -= 1
+                if len(self.live) >= self.max_live:
+                    result = 'queued'
+                else:
+                    self.live.add(key)
+                    result = 'live'
+        self.stats[result] += 1
+        return result
+    
+    def release(self, key: tuple):
+        self.live.discard(key)
+
+class TTLCache:
+    """Bounded in-memory cache with monotonic TTLs and LRU eviction.
+
+    get() only returns fresh entries. Expired entries are kept for
+    stale_window seconds so get_stale() can serve them when a refresh fails,
+    then dropped. Entries beyond max_entries or max_bytes (sizes are supplied
+    by the caller, e.g. the raw response length) are evicted least recently
+    used first.
+    """
+    def __init__(self, max_entries: int, max_bytes: int, stale_window: float):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.stale_window = stale_window
+        self.entries = OrderedDict()  # key -> [value, expires_at, size]
+        self.bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'evictions': 0, 'expirations': 0}
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def get(self, key: str):
+        """Fresh value for key, or None"""
+        entry = self.entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self.stats['misses'] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry[0]
+    
+    def get_stale(self, key: str, default=None):
+        """Value for key even if expired, as long as it's within the stale window"""
+        entry = self.entries.get(key)
+        if entry is None or entry[1] + self.stale_window <= time.monotonic():
+            return default
+        self.entries.move_to_end(key)
+        if entry[1] <= time.monotonic():
+            self.stats['stale_hits'] += 1
+        return entry[0]
+    
+    def peek(self, key: str, default=None):
+        """Value for key regardless of age, without touching recency or stats"""
+        entry = self.entries.get(key)
+        return default if entry is None else entry[0]
+    
+    def ttl(self, key: str) -> Optional[float]:
+        """Seconds until key expires (negative once expired), None if absent"""
+        entry = self.entries.get(key)
+        return None if entry is None else entry[1] - time.monotonic()
+    
+    def expire(self, key: str):
+        """Mark key as expired now, keeping it available as a stale fallback"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[1] = time.monotonic()
+    
+    def set(self, key: str, value, ttl: float, size: Optional[int] = None):
+        """Store value for ttl seconds; size defaults to the size of the entry it replaces"""
+        old = self.entries.pop(key, None)
+        if size is None:
+            size = old[2] if old is not None else sys.getsizeof(value)
+        if old is not None:
+            self.bytes -= old[2]
+        self.entries[key] = [value, time.monotonic() + ttl, size]
+        self.bytes += size
+        self._evict()
+    
+    def _evict(self):
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if entry[1] + self.stale_window <= now]:
+            self.bytes -= self.entries.pop(key)[2]
+            self.stats['expirations'] += 1
+        # Always keep the newest entry, even if it alone is over the byte budget
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, entry = self.entries.popitem(last=False)
+            self.bytes -= entry[2]
+            self.stats['evictions'] += 1
+
+class DiskCache:
+    """SQLite store of raw API responses with their fetch times and cache
+    durations, so a restart can reuse responses that are still fresh.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = None
+        self.lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS api_cache ('
+                'key TEXT PRIMARY KEY, body TEXT NOT NULL, fetched_at REAL NOT NULL, ttl REAL)'
+            )
+            columns = {row[1] for row in self.conn.execute('PRAGMA table_info(api_cache)')}
+            if 'ttl' not in columns:
+                # Caches written before durations were stored
+                self.conn.execute('ALTER TABLE api_cache ADD COLUMN ttl REAL')
+            self.conn.commit()
+        return self.conn
+    
+    def _load(self, key: str) -> Optional[tuple]:
+        with self.lock:
+            return self._connect().execute(
+                'SELECT body, fetched_at, ttl FROM api_cache WHERE key = ?', (key,)
+            ).fetchone()
+    
+    def _store(self, key: str, body: str, fetched_at: float, ttl: Optional[float]):
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO api_cache (key, body, fetched_at, ttl) VALUES (?, ?, ?, ?)',
+                (key, body, fetched_at, ttl)
+            )
+            conn.commit()
+    
+    def _touch(self, key: str, fetched_at: float, ttl: Optional[float]):
+        with self.lock:
+            conn = self._connect()
+            conn.execute('UPDATE api_cache SET fetched_at = ?, ttl = ? WHERE key = ?', (fetched_at, ttl, key))
+            conn.commit()
+    
+    async def load(self, key: str) -> Optional[tuple]:
+        """Return (raw body, fetched_at epoch seconds, ttl seconds or None) for key, or None"""
+        return await asyncio.to_thread(self._load, key)
+    
+    async def store(self, key: str, body: str, fetched_at: float, ttl: Optional[float] = None):
+        """Persist a raw response body with its fetch time and cache duration"""
+        await asyncio.to_thread(self._store, key, body, fetched_at, ttl)
+    
+    async def touch(self, key: str, fetched_at: float, ttl: Optional[float] = None):
+        """Mark a stored body as re-fetched unchanged, with its new cache duration"""
+        await asyncio.to_thread(self._touch, key, fetched_at, ttl)
+
+class JsonArrayStream:
+    """Incremental decoder for a top-level JSON array.
+
+    Feed it response chunks and it returns each element as soon as the element
+    is complete, so the decoded body never exists as one list; only the kept
+    elements do.
+    """
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.started = False
+        self.finished = False
+        self.count = 0
+    
+    def feed(self, chunk: bytes) -> list:
+        """Add a chunk of the body and return the elements it completed"""
+        buffer = self.buffer + self.text.decode(chunk)
+        items = []
+        pos = 0
+        while not self.finished:
+            # Skip whitespace and separators up to the next element
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not self.started:
+                if buffer[pos] != '[':
+                    raise ValueError("Expected a JSON array")
+                self.started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                self.finished = True
+                pos += 1
+                break
+            try:
+                item, pos = self.decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Element continues in the next chunk
+            items.append(item)
+        self.count += len(items)
+        self.buffer = buffer[pos:]
+        return items
+    
+    def close(self):
+        """Check the array was complete"""
+        if not self.finished or self.buffer.strip():
+            raise ValueError("Truncated or malformed JSON array")
+
+class HistoryStore:
+    """Append-only log of the odds each refresh extracted from.
+
+    Each record is a fixed header (magic, fetch time, sport key, title and
+    payload lengths), the UTF-8 sport key and title, then the zlib-compressed
+    compact JSON of the trimmed events. Readers mmap the file, walk the
+    headers with scan() and only decompress the records they replay. A
+    partially written final record (e.g. after a crash) is ignored.
+    """
+    MAGIC = b'BBH1'
+    HEADER = struct.Struct('<4sdHHI')
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+    
+    def append(self, fetched_at: float, sport_key: str, sport_title: str, events: List[Dict]):
+        """Append one sport's events (blocking; run in a thread)"""
+        key = sport_key.encode()
+        title = sport_title.encode()
+        payload = zlib.compress(json.dumps(events, separators=(',', ':')).encode(), 6)
+        record = self.HEADER.pack(self.MAGIC, fetched_at, len(key), len(title), len(payload)) + key + title + payload
+        with self.lock, open(self.path, 'ab') as f:
+            f.write(record)
+    
+    def open(self) -> Optional[mmap.mmap]:
+        """Read-only map of the log, None if it's missing or empty"""
+        try:
+            with open(self.path, 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+    
+    def scan(self, view: mmap.mmap) -> List[tuple]:
+        """(fetched_at, sport_key, sport_title, payload offset, payload length) for every complete record"""
+        records = []
+        offset = 0
+        size = len(view)
+        while offset + self.HEADER.size <= size:
+            magic, fetched_at, key_length, title_length, payload_length = self.HEADER.unpack_from(view, offset)
+            start = offset + self.HEADER.size
+            end = start + key_length + title_length + payload_length
+            if magic != self.MAGIC or end > size:
+                break
+            sport_key = view[start:start + key_length].decode()
+            sport_title = view[start + key_length:start + key_length + title_length].decode()
+            records.append((fetched_at, sport_key, sport_title, start + key_length + title_length, payload_length))
+            offset = end
+        return records
+    
+    @staticmethod
+    def events(view: mmap.mmap, offset: int, length: int) -> List[Dict]:
+        return json.loads(zlib.decompress(view[offset:offset + length]))
+
+class SearchQueue:
+    """Pending searches bucketed by bookmaker, with a deadline heap for expiry"""
+    def __init__(self):
+        self.entries: Dict[int, Dict] = {}
+        self.buckets: Dict[str, Dict[int, Dict]] = {}
+        self.deadlines = []  # (expires_at, search_id) min-heap; removed ids are skipped lazily
+        self.next_id = 1
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def add(self, search: Dict) -> int:
+        """Queue a search and return its id (replayed searches keep their stored id)"""
+        search_id = search.get('id') or self.next_id
+        self.next_id = max(self.next_id, search_id + 1)
+        search['id'] = search_id
+        self.entries[search_id] = search
+        self.buckets.setdefault(search['bookmaker'], {})[search_id] = search
+        heapq.heappush(self.deadlines, (search['expires_at'], search_id))
+        return search_id
+    
+    def find(self, user_id: int, bookmaker: str, search_mode: str) -> Optional[Dict]:
+        """The user's pending search for this bookmaker and mode, if any"""
+        for search in self.buckets.get(bookmaker, {}).values():
+            if search.get('user_id') == user_id and search['search_mode'] == search_mode:
+                return search
+        return None
+    
+    def remove(self, search: Dict) -> bool:
+        """Remove a queued search; False if it was already gone"""
+        if self.entries.pop(search['id'], None) is None:
+            return False
+        bucket = self.buckets[search['bookmaker']]
+        del bucket[search['id']]
+        if not bucket:
+            del self.buckets[search['bookmaker']]
+        return True
+    
+    def pop_expired(self, now: datetime) -> List[Dict]:
+        """Remove and return every search whose deadline has passed"""
+        expired = []
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, search_id = heapq.heappop(self.deadlines)
+            search = self.entries.get(search_id)
+            if search is not None:
+                self.remove(search)
+                expired.append(search)
+        return expired
+
+class QueueStore:
+    """SQLite copy of the search queue so pending searches survive restarts.
+
+    Only the serializable fields are stored (the Discord interaction can't be).
+    Changes are buffered and written in one transaction per flush.
+    """
+    FIELDS = ('id', 'user_id', 'user_mention', 'amount', 'bookmaker', 'search_mode', 'attempts', 'added_at', 'expires_at')
+    
+    def __init__(self, path: str, flush_delay: float = 1.0):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.conn = None
+        self.lock = threading.Lock()
+        self.pending = {}  # search id -> row to upsert, or None to delete
+        self.flush_task = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS search_queue ('
+                'id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, user_mention TEXT NOT NULL, '
+                'amount REAL NOT NULL, bookmaker TEXT NOT NULL, search_mode TEXT NOT NULL, '
+                'attempts INTEGER NOT NULL, added_at TEXT NOT NULL, expires_at TEXT NOT NULL)'
+            )
+            self.conn.commit()
+        return self.conn
+    
+    def save(self, search: Dict):
+        """Buffer an insert/update of a queued search"""
+        self.pending[search['id']] = tuple(
+            search[field].isoformat() if isinstance(search[field], datetime) else search[field]
+            for field in self.FIELDS
+        )
+        self._schedule_flush()
+    
+    def delete(self, search: Dict):
+        """Buffer removal of a search from the store"""
+        self.pending[search['id']] = None
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._delayed_flush())
+    
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_delay)
+        # Swap the buffer on the event loop so saves made during the write aren't lost
+        pending, self.pending = self.pending, {}
+        try:
+            await asyncio.to_thread(self._write, pending)
+        except Exception as e:
+            print(f"Error saving search queue: {e}")
+    
+    def flush(self):
+        """Synchronously write all buffered changes (used at shutdown)"""
+        pending, self.pending = self.pending, {}
+        self._write(pending)
+    
+    def _write(self, pending: Dict):
+        """Apply buffered changes in one transaction"""
+        if not pending:
+            return
+        upserts = [row for row in pending.values() if row is not None]
+        deletes = [(search_id,) for search_id, row in pending.items() if row is None]
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO search_queue ({', '.join(self.FIELDS)}) VALUES ({', '.join('?' * len(self.FIELDS))})",
+                    upserts
+                )
+                conn.executemany('DELETE FROM search_queue WHERE id = ?', deletes)
+    
+    def _load(self) -> List[Dict]:
+        with self.lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM search_queue ORDER BY id"
+            ).fetchall()
+        searches = []
+        for row in rows:
+            search = dict(zip(self.FIELDS, row))
+            search['added_at'] = datetime.fromisoformat(search['added_at'])
+            search['expires_at'] = datetime.fromisoformat(search['expires_at'])
+            search['interaction'] = None
+            searches.append(search)
+        return searches
+    
+    async def load(self) -> List[Dict]:
+        """Return every stored search, oldest first"""
+        return await asyncio.to_thread(self._load)
+
+# Queue for pending searches. queue_lock only guards queue mutation, never network I/O.
+search_queue = SearchQueue()
+queue_lock = asyncio.Lock()
+
+class NotificationDispatcher:
+    """Delivers queue notifications by DM from a bounded pool of workers.
+
+    User objects are cached so repeat recipients don't cost a fetch_user REST
+    call. 429s are retried after Retry-After, other transient failures with
+    exponential backoff, and closed DMs fall back to a channel mention.
+    """
+    def __init__(self, workers: int, max_attempts: int = 3, user_cache_size: int = 1000):
+        self.jobs = asyncio.Queue()
+        self.worker_count = max(1, workers)
+        self.workers = []
+        self.max_attempts = max_attempts
+        self.users = OrderedDict()
+        self.user_cache_size = user_cache_size
+        self.stats = {
+            'sent': 0, 'channel_fallbacks': 0, 'failed': 0, 'retries': 0,
+            'rate_limited': 0, 'user_cache_hits': 0, 'user_fetches': 0,
+        }
+        self.total_delivery_seconds = 0.0
+    
+    def start(self):
+        """Start (or restart) the worker pool; safe to call on every reconnect"""
+        self.workers = [worker for worker in self.workers if not worker.done()]
+        while len(self.workers) < self.worker_count:
+            self.workers.append(asyncio.create_task(self._worker()))
+    
+    def submit(self, user_id: int, content: str, embed: Optional[discord.Embed] = None, fallback_content: Optional[str] = None,
+               on_done=None, search_added_at: Optional[datetime] = None):
+        """Queue a DM; fallback_content is posted in the channel if the user's DMs are closed.
+        on_done() is called once delivery has finished (sent, fallen back or given up),
+        but not if the worker is cancelled first, e.g. at shutdown. For match
+        notifications, search_added_at is when the search was queued.
+        """
+        self.jobs.put_nowait({
+            'user_id': user_id,
+            'content': content,
+            'embed': embed,
+            'fallback_content': fallback_content,
+            'on_done': on_done,
+            'search_added_at': search_added_at,
+            'queued_at': time.monotonic(),
+        })
+    
+    def summary(self) -> str:
+        delivered = self.stats['sent'] + self.stats['channel_fallbacks']
+        avg = self.total_delivery_seconds / delivered if delivered else 0.0
+        return (
+            f"sent={self.stats['sent']} fallbacks={self.stats['channel_fallbacks']} failed={self.stats['failed']} "
+            f"retries={self.stats['retries']} rate_limited={self.stats['rate_limited']} "
+            f"user_cache_hits={self.stats['user_cache_hits']} user_fetches={self.stats['user_fetches']} "
+            f"avg_latency={avg:.2f}s pending={self.jobs.qsize()}"
+        )
+    
+    def record_delivery(self, job: Dict):
+        elapsed = time.monotonic() - job['queued_at']
+        self.total_delivery_seconds += elapsed
+        metrics.observe('notification_delivery_seconds', elapsed)
+        if job['search_added_at'] is not None:
+            metrics.observe('queue_match_seconds', (datetime.now() - job['search_added_at']).total_seconds())
+    
+    async def get_user(self, user_id: int):
+        """Return a user object, preferring the local and gateway caches over REST"""
+        user = self.users.get(user_id)
+        if user is not None:
+            self.users.move_to_end(user_id)
+            self.stats['user_cache_hits'] += 1
+            return user
+        user = bot.get_user(user_id)
+        if user is None:
+            self.stats['user_fetches'] += 1
+            user = await bot.fetch_user(user_id)
+        self.users[user_id] = user
+        if len(self.users) > self.user_cache_size:
+            self.users.popitem(last=False)
+        return user
+    
+    async def _worker(self):
+        while True:
+            job = await self.jobs.get()
+            try:
+                await self._deliver(job)
+            except Exception as e:
+                self.stats['failed'] += 1
+                print(f"Error notifying user {job['user_id']}: {e}")
+            finally:
+                self.jobs.task_done()
+                if self.jobs.empty():
+                    print(f"Notifications drained: {self.summary()}")
+            # Not reached if the worker was cancelled mid-delivery
+            if job['on_done']:
+                job['on_done']()
+    
+    async def _deliver(self, job: Dict):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                user = await self.get_user(job['user_id'])
+                await user.send(content=job['content'], embed=job['embed'])
+                self.stats['sent'] += 1
+                self.record_delivery(job)
+                debug_log(f"✅ Sent DM to user {job['user_id']}")
+                return
+            except discord.Forbidden:
+                print(f"⚠ Cannot DM user {job['user_id']} - DMs disabled")
+                await self._send_fallback(job)
+                return
+            except discord.NotFound:
+                print(f"⚠ Could not fetch user {job['user_id']}")
+                self.stats['failed'] += 1
+                return
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self.stats['rate_limited'] += 1
+                    try:
+                        delay = float(e.response.headers.get('Retry-After', 1))
+                    except (AttributeError, TypeError, ValueError):
+                        delay = 1.0
+                elif e.status >= 500:
+                    delay = 2 ** attempt
+                else:
+                    print(f"Error notifying user {job['user_id']}: {e}")
+                    self.stats['failed'] += 1
+                    return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                delay = 2 ** attempt
+            
+            if attempt < self.max_attempts:
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+        
+        print(f"⚠ Giving up notifying user {job['user_id']} after {self.max_attempts} attempts")
+        self.stats['failed'] += 1
+    
+    async def _send_fallback(self, job: Dict):
+        """Post in the channel as a last resort when DMs are closed"""
+        if not job['fallback_content']:
+            return
+        try:
+            channel = bot.get_channel(CHANNEL_ID)
+            if channel:
+                await channel.send(
+                    content=job['fallback_content'],
+                    embed=job['embed'],
+                    delete_after=60  # Delete after 1 minute for privacy
+                )
+                self.stats['channel_fallbacks'] += 1
+                self.record_delivery(job)
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"Error posting channel fallback for user {job['user_id']}: {e}")
+
+class CreditScheduler:
+    """Plans per-sport odds refresh intervals within the Odds API credit budget.
+
+    Sports with events starting soon are polled more often, distant or empty
+    sports go idle, and if the planned daily spend exceeds the credits left
+    (from the x-requests-* headers) spread over the days until the quota
+    resets, every interval is stretched proportionally.
+    """
+    # (events start within, refresh every N seconds)
+    PROXIMITY_INTERVALS = [
+        (timedelta(hours=3), 300),
+        (timedelta(hours=24), 900),
+        (timedelta(days=3), 3600),
+    ]
+    DISTANT_INTERVAL = 3 * 3600
+    IDLE_INTERVAL = 6 * 3600
+    
+    def __init__(self, reset_day: int):
+        self.reset_day = min(max(reset_day, 1), 31)  # Capped to each month's last day when used
+        self.remaining = None
+        self.used = None
+        self.last_cost = len(ODDS_MARKETS.split(','))  # Credits per odds call: markets x regions
+        self.next_start: Dict[str, Optional[datetime]] = {}
+    
+    def update_usage(self, headers):
+        """Record the credit usage headers from an API response"""
+        try:
+            if 'x-requests-remaining' in headers:
+                self.remaining = float(headers['x-requests-remaining'])
+            if 'x-requests-used' in headers:
+                self.used = float(headers['x-requests-used'])
+            if float(headers.get('x-requests-last', 0)) > 0:
+                self.last_cost = float(headers['x-requests-last'])
+        except (TypeError, ValueError):
+            pass
+    
+    def record_events(self, sport_key: str, events: List[Dict]):
+        """Remember when a sport's next event starts"""
+        now_aware = datetime.now().astimezone()
+        next_start = None
+        for event in events:
+            try:
+                commence_time = parse_commence_time(event['commence_time'])
+            except (KeyError, AttributeError, TypeError, ValueError):
+                continue
+            if commence_time > now_aware and (next_start is None or commence_time < next_start):
+                next_start = commence_time
+        self.next_start[sport_key] = next_start
+    
+    def base_interval(self, sport_key: str, now_aware: datetime) -> int:
+        """Refresh interval from event proximity alone"""
+        next_start = self.next_start.get(sport_key)
+        if next_start is None or next_start <= now_aware:
+            return self.IDLE_INTERVAL
+        until_start = next_start - now_aware
+        for within, interval in self.PROXIMITY_INTERVALS:
+            if until_start <= within:
+                return interval
+        return self.DISTANT_INTERVAL
+    
+    def reset_day_in(self, year: int, month: int) -> int:
+        """The quota reset day in a given month (the 31st falls back to the 30th, etc.)"""
+        return min(self.reset_day, calendar.monthrange(year, month)[1])
+    
+    def daily_budget(self, now_aware: datetime) -> Optional[float]:
+        """Credits available per day until the quota resets, if known"""
+        if self.remaining is None:
+            return None
+        reset = now_aware.replace(
+            day=self.reset_day_in(now_aware.year, now_aware.month), hour=0, minute=0, second=0, microsecond=0
+        )
+        if reset <= now_aware:
+            year, month = divmod(reset.year * 12 + reset.month, 12)
+            month += 1
+            reset = reset.replace(year=year, month=month, day=self.reset_day_in(year, month))
+        days_left = max((reset - now_aware).total_seconds() / 86400, 1.0)
+        return self.remaining / days_left
+    
+    def interval_for(self, sport_key: str) -> int:
+        """Seconds until sport_key's odds should be fetched again"""
+        now_aware = datetime.now().astimezone()
+        interval = self.base_interval(sport_key, now_aware)
+        budget = self.daily_budget(now_aware)
+        if budget is None:
+            return interval
+        if budget <= 0:
+            return max(interval, self.IDLE_INTERVAL)
+        
+        planned = sum(86400 / self.base_interval(key, now_aware) for key in self.next_start) * self.last_cost
+        return int(interval * max(1.0, planned / budget))
+
+def bonus_return_ratio(bonus_odds: float, hedge_odds: float) -> float:
+    """Guaranteed return per dollar of bonus bet (see calculate_bonus_bet_opportunity)"""
+    return (bonus_odds - 1) * (1 - 1 / hedge_odds)
+
+def evaluate_bonus_bets(amounts: np.ndarray, bonus_odds: np.ndarray, hedge_odds: np.ndarray) -> Dict[str, np.ndarray]:
+    """Vectorized calculate_bonus_bet_opportunity over an amounts x opportunities grid (unrounded)"""
+    bonus_payout = amounts[:, None] * (bonus_odds - 1)[None, :]
+    hedge_amount = bonus_payout / hedge_odds[None, :]
+    return {
+        'bonus_payout_if_wins': bonus_payout,
+        'hedge_amount': hedge_amount,
+        'guaranteed_return': bonus_payout - hedge_amount,
+    }
+
+class EventInfo:
+    """Event details shared by every opportunity extracted from that event"""
+    __slots__ = ('event_id', 'sport_title', 'home_team', 'away_team', 'commence_time')
+    
+    def __init__(self, event_id: str, sport_title: str, home_team: str, away_team: str, commence_time: datetime):
+        self.event_id = event_id
+        self.sport_title = sys.intern(sport_title)
+        self.home_team = sys.intern(home_team)
+        self.away_team = sys.intern(away_team)
+        self.commence_time = commence_time
+
+class Opportunity:
+    """One bonus/hedge pairing. Compact record with interned strings; call
+    to_dict() only when building an embed or other output.
+    """
+    __slots__ = (
+        'event', 'market_type', 'bonus_bookmaker', 'bonus_outcome', 'bonus_odds',
+        'hedge_bookmaker', 'hedge_outcome', 'hedge_odds', 'return_ratio',
+    )
+    
+    def __init__(self, event: EventInfo, market_type: str, bonus_bookmaker: str, bonus_outcome: str, bonus_odds: float,
+                 hedge_bookmaker: str, hedge_outcome: str, hedge_odds: float):
+        self.event = event
+        self.market_type = sys.intern(market_type)
+        self.bonus_bookmaker = sys.intern(bonus_bookmaker)
+        self.bonus_outcome = sys.intern(bonus_outcome)
+        self.bonus_odds = bonus_odds
+        self.hedge_bookmaker = sys.intern(hedge_bookmaker)
+        self.hedge_outcome = sys.intern(hedge_outcome)
+        self.hedge_odds = hedge_odds
+        self.return_ratio = bonus_return_ratio(bonus_odds, hedge_odds)
+    
+    def to_dict(self) -> Dict:
+        event = self.event
+        return {
+            'event_id': event.event_id,
+            'sport_title': event.sport_title,
+            'home_team': event.home_team,
+            'away_team': event.away_team,
+            'commence_time': event.commence_time,
+            'market_type': self.market_type,
+            'market_display': MARKET_DISPLAY_NAMES.get(self.market_type, self.market_type),
+            'bonus_bookmaker': self.bonus_bookmaker,
+            'bonus_outcome': self.bonus_outcome,
+            'bonus_odds_decimal': self.bonus_odds,
+            'hedge_bookmaker': self.hedge_bookmaker,
+            'hedge_outcome': self.hedge_outcome,
+            'hedge_odds_decimal': self.hedge_odds,
+            'return_ratio': self.return_ratio,
+        }
+
+# Sort key for opportunity rankings (highest return ratio first)
+rank_key = attrgetter('return_ratio')
+
+def rank_by_bookmaker(opportunities: List[Opportunity]) -> Dict[str, List[Opportunity]]:
+    """Group opportunities by bonus bookmaker, each group sorted by return ratio"""
+    by_bookmaker = {}
+    for opp in opportunities:
+        by_bookmaker.setdefault(opp.bonus_bookmaker, []).append(opp)
+    for ranked in by_bookmaker.values():
+        ranked.sort(key=rank_key, reverse=True)
+    return by_bookmaker
+
+class OpportunitySnapshot:
+    """Extracted opportunities from one refresh, ranked per bonus bookmaker.
+
+    Guaranteed return is linear in the bonus amount, so each bookmaker's
+    ranking by return ratio holds for every amount and is computed once here.
+    Snapshots are never modified after they're published; a refresh replaces
+    the whole snapshot with a new version.
+    """
+    def __init__(self, opportunities: List[Opportunity], version: int = 0, by_bookmaker: Optional[Dict[str, List[Opportunity]]] = None):
+        self.opportunities = opportunities
+        self.version = version
+        self.created_at = time.monotonic()
+        self.by_bookmaker = rank_by_bookmaker(opportunities) if by_bookmaker is None else by_bookmaker
+        self.arrays = {}  # Per-bookmaker odds arrays, built on first batch evaluation
+    
+    def __len__(self):
+        return len(self.opportunities)
+    
+    def age(self) -> float:
+        """Seconds since this snapshot was built"""
+        return time.monotonic() - self.created_at
+    
+    def bookmaker_arrays(self, bookmaker: str) -> tuple:
+        """(bonus odds, hedge odds, commence epoch) arrays in ranking order for one bookmaker"""
+        arrays = self.arrays.get(bookmaker)
+        if arrays is None:
+            ranked = self.by_bookmaker.get(bookmaker, [])
+            arrays = self.arrays[bookmaker] = (
+                np.fromiter((opp.bonus_odds for opp in ranked), dtype=np.float64, count=len(ranked)),
+                np.fromiter((opp.hedge_odds for opp in ranked), dtype=np.float64, count=len(ranked)),
+                np.fromiter((opp.event.commence_time.timestamp() for opp in ranked), dtype=np.float64, count=len(ranked)),
+            )
+        return arrays
+    
+    def select_batch(self, bookmaker: str, amounts: List[float], modes: List[str], now_ts: float) -> List[Optional[int]]:
+        """Pick an opportunity index (into by_bookmaker[bookmaker]) for each search in one pass.
+        'best' takes the highest guaranteed return, 'quick' the first candidate
+        clearing QUICK_RETURN_THRESHOLD (or the best if none does); events that
+        have started are skipped. None means nothing is available.
+        """
+        bonus_odds, hedge_odds, commence = self.bookmaker_arrays(bookmaker)
+        if not len(bonus_odds) or not amounts:
+            return [None] * len(amounts)
+        
+        amounts = np.asarray(amounts, dtype=np.float64)
+        returns = evaluate_bonus_bets(amounts, bonus_odds, hedge_odds)['guaranteed_return']
+        returns[:, commence <= now_ts] = -np.inf
+        
+        best = returns.argmax(axis=1)
+        meets = returns >= (amounts * QUICK_RETURN_THRESHOLD)[:, None]
+        quick = np.where(meets.any(axis=1), meets.argmax(axis=1), best)
+        picks = np.where(np.asarray(modes) == 'quick', quick, best)
+        available = np.isfinite(returns[np.arange(len(amounts)), picks])
+        return [int(pick) if ok else None for pick, ok in zip(picks, available)]
+    
+    def patched(self, removed_events: set, added: List[Opportunity], version: int) -> 'OpportunitySnapshot':
+        """Return a new snapshot with removed_events' opportunities dropped and added merged in.
+        Rankings are merged rather than re-sorted, and untouched ones are shared.
+        """
+        added_ranked = rank_by_bookmaker(added)
+        by_bookmaker = {}
+        for bookmaker in set(self.by_bookmaker) | set(added_ranked):
+            ranked = self.by_bookmaker.get(bookmaker, [])
+            if removed_events:
+                ranked = [opp for opp in ranked if opp.event.event_id not in removed_events]
+            if bookmaker in added_ranked:
+                ranked = list(heapq.merge(ranked, added_ranked[bookmaker], key=rank_key, reverse=True))
+            if ranked:
+                by_bookmaker[bookmaker] = ranked
+        
+        opportunities = self.opportunities
+        if removed_events:
+            opportunities = [opp for opp in opportunities if opp.event.event_id not in removed_events]
+        return OpportunitySnapshot(opportunities + added, version, by_bookmaker)
+
+class SnapshotFile:
+    """Opportunity snapshots shared between a fetcher process and front-ends.
+
+    The fetcher writes a fixed header (magic, version, publish time, payload
+    length) and a compact JSON payload to a temp file and os.replace()s it
+    into place, so readers never see a partial file. Readers mmap the file
+    and only decode the payload when the header's version has changed.
+    Rankings are stored in order, so readers don't re-sort.
+    """
+    MAGIC = b'BBSNAP01'
+    HEADER = struct.Struct('<8sQdQ')
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def encode(self, snapshot: OpportunitySnapshot, meta: Dict) -> bytes:
+        events = {}  # event_id -> index into event_rows
+        event_rows = []
+        ranked = {}
+        for bookmaker, opportunities in snapshot.by_bookmaker.items():
+            rows = ranked[bookmaker] = []
+            for opp in opportunities:
+                event = opp.event
+                index = events.get(event.event_id)
+                if index is None:
+                    index = events[event.event_id] = len(event_rows)
+                    event_rows.append((event.event_id, event.sport_title, event.home_team, event.away_team,
+                                       event.commence_time.isoformat()))
+                rows.append((index, opp.market_type, opp.bonus_outcome, opp.bonus_odds,
+                             opp.hedge_bookmaker, opp.hedge_outcome, opp.hedge_odds))
+        return json.dumps({'meta': meta, 'events': event_rows, 'ranked': ranked}, separators=(',', ':')).encode()
+    
+    def write(self, snapshot: OpportunitySnapshot, meta: Dict):
+        """Atomically replace the shared file with snapshot (blocking; run in a thread)"""
+        payload = self.encode(snapshot, meta)
+        header = self.HEADER.pack(self.MAGIC, snapshot.version, time.time(), len(payload))
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(temp_path, self.path)
+    
+    def _read_header(self, view) -> Optional[tuple]:
+        if len(view) < self.HEADER.size:
+            return None
+        magic, version, published_at, length = self.HEADER.unpack_from(view)
+        if magic != self.MAGIC or self.HEADER.size + length > len(view):
+            return None
+        return version, published_at, length
+    
+    def read_version(self) -> Optional[int]:
+        """Version of the published snapshot, None if there isn't a valid one"""
+        try:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                header = self._read_header(view)
+        except (OSError, ValueError):
+            return None
+        return header[0] if header else None
+    
+    def read(self, current_version: Optional[int] = None) -> Optional[tuple]:
+        """(snapshot, meta) if the published version differs from current_version,
+        else None (blocking; run in a thread)
+        """
+        try:
+            with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                header = self._read_header(view)
+                if header is None or header[0] == current_version:
+                    return None
+                version, published_at, length = header
+                payload = json.loads(view[self.HEADER.size:self.HEADER.size + length])
+        except (OSError, ValueError):
+            # Missing, empty (mmap of a 0-byte file) or unreadable
+            return None
+        
+        events = [
+            EventInfo(event_id, sport_title, home_team, away_team, parse_commence_time(commence_time))
+            for event_id, sport_title, home_team, away_team, commence_time in payload['events']
+        ]
+        by_bookmaker = {
+            bookmaker: [Opportunity(events[row[0]], row[1], bookmaker, *row[2:]) for row in rows]
+            for bookmaker, rows in payload['ranked'].items()
+        }
+        opportunities = [opp for ranked in by_bookmaker.values() for opp in ranked]
+        snapshot = OpportunitySnapshot(opportunities, version, by_bookmaker)
+        # Age from when the fetcher published it, not when it was read
+        snapshot.created_at -= max(time.time() - published_at, 0)
+        return snapshot, payload['meta']
+
+def extract_event_rows(event: Dict) -> List[tuple]:
+    """Every 2-way bonus/hedge pairing in one event, as
+    (market, bonus bookmaker, bonus outcome, bonus odds, hedge bookmaker, hedge outcome, hedge odds)
+    """
+    rows = []
+    bookmakers = event.get('bookmakers', [])
+    price_index = build_price_index(bookmakers)
+    
+    for bookmaker in bookmakers:
+        bookmaker_key = bookmaker['key']
+        
+        for market in bookmaker.get('markets', []):
+            market_type = market['key']
+            outcomes = market.get('outcomes', [])
+            
+            if len(outcomes) != 2:  # Only 2-way markets
+                continue
+            
+            for i, bonus_outcome in enumerate(outcomes):
+                hedge_outcome = outcomes[1 - i]
+                
+                # Best hedge odds from any other bookmaker on the same line
+                best_hedge_odds, best_hedge_bookmaker = best_hedge_price(
+                    price_index,
+                    (market_type, hedge_outcome['name'], hedge_outcome.get('point')),
+                    bookmaker_key
+                )
+                
+                if not best_hedge_bookmaker or best_hedge_odds == 0:
+                    continue
+                
+                rows.append((
+                    market_type,
+                    bookmaker_key,
+                    bonus_outcome['name'],
+                    bonus_outcome['price'],
+                    best_hedge_bookmaker,
+                    hedge_outcome['name'],
+                    best_hedge_odds,
+                ))
+    
+    return rows
+
+def extract_events(jobs: List[tuple]) -> List[tuple]:
+    """Extract (event_id, commence_time, rows) for each (event_id, event) job.
+    Independent of the current time and of any bot state, and takes and returns
+    plain tuples, so it can run in an extraction worker process.
+    """
+    results = []
+    for event_id, event in jobs:
+        try:
+            commence_time = parse_commence_time(event['commence_time'])
+        except (KeyError, AttributeError, TypeError, ValueError):
+            results.append((event_id, None, ()))
+            continue
+        if is_soccer_text(event.get('home_team', '')) or is_soccer_text(event.get('away_team', '')):
+            results.append((event_id, commence_time, ()))
+            continue
+        results.append((event_id, commence_time, extract_event_rows(event)))
+    return results
+
+class ExtractionPool:
+    """Runs extract_events() in worker processes so large slates don't stall
+    the event loop (and the Discord gateway heartbeat). With 0 workers it runs
+    inline. A crashed pool is replaced and that batch is extracted inline.
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = None
+    
+    def _executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            # forkserver avoids forking a process that has live threads (sqlite, aiohttp)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self.executor
+    
+    async def run(self, jobs: List[tuple]) -> List[tuple]:
+        if not jobs:
+            return []
+        if self.workers <= 0:
+            return extract_events(jobs)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(), extract_events, jobs)
+        except BrokenProcessPool:
+            print("\u26a0 Extraction worker died - restarting the pool and extracting inline")
+            self.shutdown()
+            return extract_events(jobs)
+    
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
 def create_interface_embed():
     """Create the main interface embed"""
     embed = discord.Embed(
@@ -79,14 +1377,112 @@ def create_interface_embed():
 
 class ArbitrageBot:
     def __init__(self):
-        self.cache = {}
-        self.cache_expiry = {}
+        self.cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_STALE_SECONDS)
         self.search_task = None
+        self.refresh_task = None
         self.session = None
+        self.request_limiter = RequestLimiter(ODDS_MAX_CONCURRENT_REQUESTS, ODDS_REQUESTS_PER_SECOND)
+        self.disk_cache = DiskCache(CACHE_DB_PATH) if CACHE_DB_PATH else None
+        self.notifier = NotificationDispatcher(NOTIFY_WORKERS)
+        self.admission = SearchAdmission(SEARCH_MAX_LIVE, SEARCH_BURST, SEARCH_RATE_PER_MINUTE)
+        self.credits = CreditScheduler(ODDS_CREDIT_RESET_DAY)
+        self.queue_store = QueueStore(QUEUE_DB_PATH) if QUEUE_DB_PATH else None
+        self.queue_restored = False
         # Cache durations (in seconds)
         self.SPORTS_CACHE_DURATION = 3600  # 1 hour for sports list
         self.ODDS_CACHE_DURATION = 300     # 5 minutes for odds data
+        self.SNAPSHOT_REFRESH_INTERVAL = 900  # Longest gap between background snapshot refreshes
+        self.MIN_REFRESH_INTERVAL = 60     # Shortest gap between background snapshot refreshes
+        self.SNAPSHOT_MAX_AGE = 300        # Older snapshots are still served but revalidated
+        self.snapshot = None               # Latest published OpportunitySnapshot
+        self.snapshot_published = asyncio.Event()  # Set (and replaced) on each publish
         self.last_full_fetch = None        # Track last complete data fetch
+        self.inflight = {}                 # In-flight fetch tasks by key (single-flight)
+        self.body_hashes = {}              # Digest of the last raw response body per odds cache key
+        self.sport_extractions = {}        # Per-sport event extraction state for incremental refreshes
+        self.extractor = ExtractionPool(EXTRACTION_WORKERS)
+        self.role = BOT_ROLE
+        self.snapshot_file = SnapshotFile(SNAPSHOT_PATH) if self.role != 'all' else None
+        self.version_floor = 0             # A restarted fetcher continues from the published version
+        self.refresh_progress = None       # Sports done/total and opportunities so far for the refresh in flight
+        self.progress_listeners = set()    # Queues receiving (done, total, added) as each sport is extracted
+        self.history = HistoryStore(HISTORY_PATH) if HISTORY_PATH else None
+        self.history_recorded = {}         # Last events list appended to the history per sport
+        self.connected_once = False        # on_ready has run its one-time setup
+        self.interface_ready = False       # The channel interface message is posted and current
+        self.metrics_runner = None         # aiohttp runner serving /metrics
+        self.register_metrics()
+    
+    def register_metrics(self):
+        """Gauges read from live state at scrape time"""
+        metrics.describe('snapshot_opportunities', 'gauge', 'Opportunities in the current snapshot',
+                         callback=lambda: len(self.snapshot) if self.snapshot else None)
+        metrics.describe('odds_api_credits_remaining', 'gauge', 'Odds API credits remaining (x-requests-remaining)',
+                         callback=lambda: self.credits.remaining)
+        metrics.describe('queue_depth', 'gauge', 'Queued searches waiting for a match',
+                         callback=lambda: len(search_queue))
+        metrics.describe('queue_oldest_seconds', 'gauge', 'Age of the oldest queued search',
+                         callback=self.oldest_queued_age)
+        metrics.describe('memory_cache_total', 'counter', 'In-memory API cache events by kind',
+                         callback=lambda: self.cache.stats, label='kind')
+        metrics.describe('memory_cache_entries', 'gauge', 'Responses held in the in-memory API cache',
+                         callback=lambda: len(self.cache))
+        metrics.describe('memory_cache_bytes', 'gauge', 'Approximate size of the in-memory API cache',
+                         callback=lambda: self.cache.bytes)
+        metrics.describe('notifications_total', 'counter', 'Notification dispatcher outcomes by kind',
+                         callback=lambda: self.notifier.stats, label='kind')
+        metrics.describe('search_admission_total', 'counter', 'Interactive searches by admission result',
+                         callback=lambda: self.admission.stats, label='result')
+    
+    def oldest_queued_age(self) -> Optional[float]:
+        if not search_queue.entries:
+            return None
+        oldest = min(search['added_at'] for search in search_queue.entries.values())
+        return (datetime.now() - oldest).total_seconds()
+    
+    async def start_metrics_server(self):
+        """Serve metrics.render() at http://METRICS_HOST:METRICS_PORT/metrics (once per process)"""
+        if self.metrics_runner or not METRICS_PORT:
+            return
+        
+        async def handle_metrics(request):
+            return web.Response(text=metrics.render(), content_type='text/plain')
+        
+        app = web.Application()
+        app.router.add_get('/metrics', handle_metrics)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+        except OSError as e:
+            print(f"Error starting metrics endpoint on {METRICS_HOST}:{METRICS_PORT}: {e}")
+            await runner.cleanup()
+            return
+        self.metrics_runner = runner
+        print(f"Metrics available at http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    
+    def metrics_summary(self) -> str:
+        """Short human-readable digest for the !metrics command"""
+        hits = metrics.total('odds_cache_total', result='hit') + metrics.total('odds_cache_total', result='persisted')
+        lookups = metrics.total('odds_cache_total')
+        fetch_mean = metrics.mean('odds_fetch_seconds')
+        refresh_mean = metrics.mean('refresh_seconds')
+        match_mean = metrics.mean('queue_match_seconds')
+        oldest = self.oldest_queued_age()
+        credits = self.credits.remaining
+        lines = [
+            f"Snapshot: v{self.snapshot.version}, {len(self.snapshot)} opportunities, {self.snapshot.age():.0f}s old" if self.snapshot else "Snapshot: none yet",
+            f"Odds API credits remaining: {credits:.0f}" if credits is not None else "Odds API credits remaining: unknown",
+            f"Odds cache: {hits:.0f}/{lookups:.0f} hits, {metrics.total('odds_cache_total', result='stale'):.0f} stale serves, "
+            f"{metrics.total('odds_fetch_errors_total'):.0f} fetch errors",
+            f"Memory cache: {len(self.cache)} entries, {self.cache.bytes / 1048576:.1f}MB, {self.cache.stats['evictions']} evicted",
+            f"Avg odds fetch: {fetch_mean * 1000:.0f}ms" if fetch_mean is not None else "Avg odds fetch: n/a",
+            f"Avg refresh: {refresh_mean:.2f}s" if refresh_mean is not None else "Avg refresh: n/a",
+            f"Queue: {len(search_queue)} searches, oldest {oldest / 3600:.1f}h" if oldest is not None else "Queue: empty",
+            f"Avg queue-to-notify: {match_mean / 60:.1f}min" if match_mean is not None else "Avg queue-to-notify: n/a",
+            f"Notifications: {self.notifier.summary()}",
+        ]
+        return '\n'.join(lines)
     
     async def get_session(self):
         """Get or create aiohttp session"""
@@ -99,204 +1495,473 @@ class ArbitrageBot:
         if self.session and not self.session.closed:
             await self.session.close()
     
-    async def add_to_queue(self, user_id: int, user_mention: str, amount: float, bookmaker: str, search_mode: str, interaction: discord.Interaction):
-        """Add a search request to the queue"""
+    def start_single_flight(self, key: str, fetch) -> asyncio.Task:
+        """Start fetch() for key unless it's already in flight, returning the shared task"""
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self.inflight.pop(key, None) if self.inflight.get(key) is done else None)
+        return task
+    
+    async def single_flight(self, key: str, fetch):
+        """Run fetch() once per key; concurrent callers await the same in-flight task"""
+        # Shield so one caller giving up doesn't cancel the fetch for everyone else
+        return await asyncio.shield(self.start_single_flight(key, fetch))
+    
+    def get_snapshot(self) -> Optional[OpportunitySnapshot]:
+        """Return the current snapshot immediately (stale-while-revalidate).
+        A missing snapshot, or one not revalidated for SNAPSHOT_MAX_AGE, triggers
+        a background refresh; callers get whatever is current now and the next
+        read sees the new version. (A refresh that finds no changes keeps the
+        snapshot, so its age() can be much older than the last check.)
+        """
+        snapshot = self.snapshot
+        if self.role == 'frontend':
+            # Front-ends never fetch; the fetcher process keeps the shared snapshot fresh
+            return snapshot
+        checked = self.last_full_fetch
+        if snapshot is None or checked is None or (datetime.now() - checked).total_seconds() > self.SNAPSHOT_MAX_AGE:
+            self.start_single_flight('all_opportunities', self._refresh_opportunities)
+        return snapshot
+    
+    def start_background_refresh(self):
+        """Start the snapshot refresher (or, on a front-end, the follower) unless it's running.
+        Neither needs Discord, so this runs before login to warm the snapshot.
+        """
+        if self.refresh_task and not self.refresh_task.done():
+            return
+        if self.role == 'frontend':
+            self.refresh_task = asyncio.create_task(self.follow_snapshots())
+            print("Started snapshot follower")
+        else:
+            self.refresh_task = asyncio.create_task(self.refresh_snapshots())
+            print("Started background snapshot refresher")
+    
+    async def refresh_snapshots(self):
+        """Background task that keeps the opportunities snapshot fresh"""
+        print("Snapshot refresher started - refreshing as each sport's odds fall due")
+        
+        while not bot.is_closed():
+            try:
+                await self.fetch_all_opportunities_cached()
+                if self.credits.remaining is not None:
+                    print(f"Odds API credits remaining: {self.credits.remaining:.0f}")
+            except Exception as e:
+                print(f"Error refreshing snapshot: {e}")
+            
+            await asyncio.sleep(self.next_refresh_delay())
+    
+    def publish_snapshot(self, snapshot: OpportunitySnapshot):
+        """Make snapshot current and wake everything waiting for a new version"""
+        self.snapshot = snapshot
+        published, self.snapshot_published = self.snapshot_published, asyncio.Event()
+        published.set()
+    
+    async def run_fetcher(self):
+        """Fetcher role: refresh odds and publish snapshots to SNAPSHOT_PATH, without Discord"""
+        self.version_floor = await asyncio.to_thread(self.snapshot_file.read_version) or 0
+        print(f"Fetcher publishing snapshots to {SNAPSHOT_PATH} (from v{self.version_floor + 1})")
+        await self.start_metrics_server()
+        try:
+            await self.refresh_snapshots()
+        finally:
+            await self.close_session()
+    
+    async def write_snapshot(self, snapshot: OpportunitySnapshot):
+        """Publish snapshot to front-end processes through the shared file"""
+        try:
+            await asyncio.to_thread(self.snapshot_file.write, snapshot, {'credits_remaining': self.credits.remaining})
+        except Exception as e:
+            print(f"Error writing snapshot to {SNAPSHOT_PATH}: {e}")
+    
+    async def follow_snapshots(self, poll_interval: float = 1.0):
+        """Front-end role: load each snapshot the fetcher publishes to SNAPSHOT_PATH"""
+        print(f"Following snapshots published to {SNAPSHOT_PATH}")
+        last_mtime = None
+        
+        while not bot.is_closed():
+            try:
+                mtime = os.stat(SNAPSHOT_PATH).st_mtime_ns
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != last_mtime:
+                try:
+                    loaded = await asyncio.to_thread(
+                        self.snapshot_file.read, self.snapshot.version if self.snapshot else None
+                    )
+                    last_mtime = mtime
+                    if loaded:
+                        snapshot, meta = loaded
+                        self.credits.remaining = meta.get('credits_remaining')
+                        self.publish_snapshot(snapshot)
+                        debug_log(f"Loaded snapshot v{snapshot.version} ({len(snapshot)} opportunities)")
+                except Exception as e:
+                    print(f"Error reading snapshot from {SNAPSHOT_PATH}: {e}")
+            await asyncio.sleep(poll_interval)
+    
+    def next_refresh_delay(self) -> float:
+        """Seconds until the first sport's odds fall due, within the refresh bounds"""
+        due = [
+            ttl
+            for ttl in (self.cache.ttl(f"odds_{sport['key']}_{ODDS_MARKETS}") for sport in self.cache.peek('sports_list', []))
+            if ttl is not None
+        ]
+        delay = min(due, default=self.SNAPSHOT_REFRESH_INTERVAL)
+        return min(max(delay, self.MIN_REFRESH_INTERVAL), self.SNAPSHOT_REFRESH_INTERVAL)
+    
+    async def add_to_queue(self, user_id: int, user_mention: str, amount: float, bookmaker: str, search_mode: str, interaction: discord.Interaction) -> bool:
+        """Add a search request to the queue.
+        A repeat of a pending (user, bookmaker, mode) search updates that search
+        (amount and interaction) instead of queueing a second one; returns False then.
+        """
+        added_at = datetime.now()
+        search = {
+            'user_id': user_id,
+            'user_mention': user_mention,
+            'amount': amount,
+            'bookmaker': bookmaker,
+            'search_mode': search_mode,
+            'interaction': interaction,
+            'attempts': 0,
+            'added_at': added_at,
+            'expires_at': added_at + SEARCH_QUEUE_TTL
+        }
+        async with queue_lock:
+            pending = search_queue.find(user_id, bookmaker, search_mode)
+            if pending is not None:
+                pending['amount'] = amount
+                pending['interaction'] = interaction
+            else:
+                search_queue.add(search)
+        if self.queue_store:
+            self.queue_store.save(pending or search)
+        if pending is not None:
+            print(f"Updated queued search for user {user_id}: ${amount} on {bookmaker} ({search_mode} mode)")
+            return False
+        print(f"Added search to queue for user {user_id}: ${amount} on {bookmaker} ({search_mode} mode)")
+        return True
+    
+    async def restore_queue(self):
+        """Replay searches persisted before a restart (runs once per process)"""
+        if self.queue_restored or not self.queue_store:
+            return
+        self.queue_restored = True
+        try:
+            searches = await self.queue_store.load()
+        except Exception as e:
+            print(f"Error restoring search queue: {e}")
+            return
         async with queue_lock:
-            search_queue.append({
-                'user_id': user_id,
-                'user_mention': user_mention,
-                'amount': amount,
-                'bookmaker': bookmaker,
-                'search_mode': search_mode,
-                'interaction': interaction,
-                'attempts': 0,
-                'added_at': datetime.now()
-            })
-            print(f"Added search to queue for user {user_id}: ${amount} on {bookmaker} ({search_mode} mode)")
+            for search in searches:
+                search_queue.add(search)
+        print(f"Restored {len(searches)} queued searches")
+    
+    async def wait_for_snapshot(self, after_version: int, timeout: float) -> Optional[OpportunitySnapshot]:
+        """Wait until a snapshot newer than after_version is published (or timeout)"""
+        if self.snapshot and self.snapshot.version > after_version:
+            return self.snapshot
+        try:
+            await asyncio.wait_for(self.snapshot_published.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self.snapshot and self.snapshot.version > after_version:
+            return self.snapshot
+        return None
+    
+    def match_queue(self, snapshot: OpportunitySnapshot) -> List[tuple]:
+        """Match every queued search against a snapshot, removing the ones satisfied.
+        Must be called with queue_lock held; does no I/O. Matched searches stay
+        in the QueueStore until notify_match's DM has been delivered.
+        """
+        matches = []
+        now_ts = time.time()
+        for bookmaker, bucket in list(search_queue.buckets.items()):
+            # Evaluate every search for this bookmaker against all candidates at once
+            searches = list(bucket.values())
+            picks = snapshot.select_batch(
+                bookmaker,
+                [search['amount'] for search in searches],
+                [search['search_mode'] for search in searches],
+                now_ts
+            )
+            for search, pick in zip(searches, picks):
+                search['attempts'] += 1  # Odds updates this search has been checked against
+                if pick is not None:
+                    opportunity = self.build_opportunity(snapshot.by_bookmaker[bookmaker][pick], search['amount'])
+                    search_queue.remove(search)
+                    matches.append((search, opportunity))
+                elif self.queue_store:
+                    self.queue_store.save(search)  # Persist the new attempts count
+        return matches
+    
+    def forget_when_delivered(self, search: Dict):
+        """on_done callback removing a search from the QueueStore once its DM is out.
+        If the process stops first, the search is restored and notified again.
+        """
+        if not self.queue_store:
+            return None
+        return lambda: self.queue_store.delete(search)
+    
+    def notify_match(self, search: Dict, opportunity: Dict):
+        """Queue a DM with the found opportunity, falling back to the channel if DMs are closed"""
+        embed = self.create_opportunity_embed(opportunity, search['search_mode'])
+        embed.set_footer(text=f"✅ Found after checking {search['attempts']} odds update(s) | Checked on every odds update")
+        self.notifier.submit(
+            search['user_id'],
+            content=f"🎉 **Your bonus bet opportunity is ready!**",
+            embed=embed,
+            fallback_content=f"{search['user_mention']} 🎉 Your bonus bet opportunity is ready! (Enable DMs for private results)",
+            on_done=self.forget_when_delivered(search),
+            search_added_at=search['added_at']
+        )
+    
+    def notify_expired(self, search: Dict):
+        """Queue a DM telling the user their search expired"""
+        self.notifier.submit(
+            search['user_id'],
+            content=f"⏰ Your bonus bet search has expired after 24 hours. Please try again with different parameters.",
+            on_done=self.forget_when_delivered(search)
+        )
+        debug_log(f"Removed expired search for user {search['user_id']}")
     
     async def process_queue(self):
-        """Background task that processes the search queue every 15 minutes"""
+        """Background task that matches the search queue against each new snapshot"""
         await bot.wait_until_ready()
-        print("Queue processor started - checking every 15 minutes")
+        print("Queue processor started - matching on every snapshot refresh")
+        last_version = 0
         
         while not bot.is_closed():
             try:
+                # Wake on the next published snapshot, or every 15 minutes to expire searches
+                snapshot = await self.wait_for_snapshot(last_version, timeout=900)
+                if snapshot:
+                    last_version = snapshot.version
+                
+                # Only in-memory queue operations happen under the lock
                 async with queue_lock:
-                    if search_queue:
-                        print(f"Processing {len(search_queue)} queued searches...")
-                        
-                        # Fetch all odds data ONCE for all queued searches
-                        all_opportunities = await self.fetch_all_opportunities_cached()
-                        
-                        for search in search_queue[:]:  # Copy to avoid modification during iteration
-                            search['attempts'] += 1
-                            print(f"Checking cached data for user {search['user_id']} (attempt {search['attempts']})")
-                            
-                            try:
-                                # Find best opportunity from cached data
-                                opportunity = self.find_opportunity_from_cache(
-                                    all_opportunities,
-                                    search['bookmaker'], 
-                                    search['amount'], 
-                                    search['search_mode']
-                                )
-                                
-                                if opportunity:
-                                    # Found an opportunity! Notify the user via DM
-                                    embed = self.create_opportunity_embed(opportunity, search['search_mode'])
-                                    embed.set_footer(text=f"✅ Found after {search['attempts']} search(es) | Searched every 15 minutes")
-                                    
-                                    try:
-                                        # Send as DM to keep it private
-                                        user = await bot.fetch_user(search['user_id'])
-                                        if user:
-                                            await user.send(
-                                                content=f"🎉 **Your bonus bet opportunity is ready!**",
-                                                embed=embed
-                                            )
-                                            print(f"✅ Sent DM to user {search['user_id']} - opportunity found!")
-                                        else:
-                                            print(f"⚠ Could not fetch user {search['user_id']}")
-                                    except discord.Forbidden:
-                                        print(f"⚠ Cannot DM user {search['user_id']} - DMs disabled")
-                                        # Fallback: try to send in channel as last resort
-                                        try:
-                                            channel = bot.get_channel(CHANNEL_ID)
-                                            if channel:
-                                                await channel.send(
-                                                    content=f"{search['user_mention']} 🎉 Your bonus bet opportunity is ready! (Enable DMs for private results)",
-                                                    embed=embed,
-                                                    delete_after=60  # Delete after 1 minute for privacy
-                                                )
-                                        except:
-                                            pass
-                                    except Exception as e:
-                                        print(f"Error notifying user: {e}")
-                                    
-                                    # Remove from queue
-                                    search_queue.remove(search)
-                                else:
-                                    print(f"No opportunity found yet for user {search['user_id']}")
-                                    
-                                    # Remove after 24 hours (96 attempts at 15 min intervals)
-                                    if search['attempts'] >= 96:
-                                        try:
-                                            user = await bot.fetch_user(search['user_id'])
-                                            if user:
-                                                await user.send(
-                                                    content=f"⏰ Your bonus bet search has expired after 24 hours. Please try again with different parameters."
-                                                )
-                                        except:
-                                            pass
-                                        search_queue.remove(search)
-                                        print(f"Removed expired search for user {search['user_id']}")
-                                
-                            except Exception as e:
-                                print(f"Error processing search for user {search['user_id']}: {e}")
-                    
-                    else:
-                        print("Queue is empty, waiting...")
+                    expired = search_queue.pop_expired(datetime.now())
+                    matches = []
+                    if snapshot and search_queue:
+                        print(f"Matching {len(search_queue)} queued searches against snapshot v{snapshot.version}...")
+                        matches = self.match_queue(snapshot)
+                
+                # Delivery runs on the notifier's workers, not in this loop
+                for search, opportunity in matches:
+                    self.notify_match(search, opportunity)
+                for search in expired:
+                    self.notify_expired(search)
                 
             except Exception as e:
                 print(f"Error in queue processor: {e}")
-            
-            # Wait 15 minutes before next check (saves API credits)
-            await asyncio.sleep(900)  # 900 seconds = 15 minutes
+    
+    def load_state(self) -> Dict:
+        """Persisted bot state from STATE_PATH (blocking; run in a thread)"""
+        if not STATE_PATH or not os.path.exists(STATE_PATH):
+            return {}
+        with open(STATE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def save_state(self, **changes):
+        """Merge changes into STATE_PATH (blocking; run in a thread)"""
+        if not STATE_PATH:
+            return
+        state = self.load_state()
+        state.update(changes)
+        temp_path = f'{STATE_PATH}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, STATE_PATH)
+    
+    async def ensure_interface(self):
+        """Post or refresh the channel's interface message.
+        The message id is persisted, so restarts edit it directly instead of
+        scanning channel history, and reconnects don't touch it at all.
+        """
+        if self.interface_ready or not CHANNEL_ID:
+            return
+        channel = bot.get_channel(CHANNEL_ID)
+        if not channel:
+            return
+        
+        try:
+            message_id = (await asyncio.to_thread(self.load_state)).get('interface_message_id')
+        except Exception as e:
+            print(f"Error reading {STATE_PATH}: {e}")
+            message_id = None
+        
+        message = None
+        if message_id:
+            try:
+                message = await channel.get_partial_message(message_id).edit(embed=create_interface_embed(), view=PersistentView())
+            except discord.NotFound:
+                message_id = None  # Deleted; find or post a new one
+        
+        if message is None:
+            # No stored id (first run, or state lost): look for an earlier interface message
+            async for candidate in channel.history(limit=50):
+                if candidate.author == bot.user and candidate.embeds:
+                    embed = candidate.embeds[0]
+                    if "Want to use your bonus bet smart" in (embed.title or ''):
+                        message = await candidate.edit(embed=create_interface_embed(), view=PersistentView())
+                        break
+            if message is None:
+                message = await channel.send(embed=create_interface_embed(), view=PersistentView())
+        
+        self.interface_ready = True
+        if message.id != message_id:
+            try:
+                await asyncio.to_thread(self.save_state, interface_message_id=message.id)
+            except Exception as e:
+                print(f"Error saving {STATE_PATH}: {e}")
     
     def is_soccer_related(self, text: str) -> bool:
         """Check if text contains soccer-related keywords"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in SOCCER_KEYWORDS)
+        return is_soccer_text(text)
+    
+    async def persist_response(self, cache_key: str, body: Optional[str], ttl: Optional[float] = None):
+        """Write an API response through to the disk cache (None: body unchanged, just re-stamp it).
+        ttl is how long it stays fresh; without one, load_persisted's default duration applies.
+        """
+        if not self.disk_cache:
+            return
+        try:
+            if body is None:
+                await self.disk_cache.touch(cache_key, time.time(), ttl)
+            else:
+                await self.disk_cache.store(cache_key, body, time.time(), ttl)
+        except Exception as e:
+            print(f"  \u26a0 Could not persist {cache_key}: {e}")
+    
+    async def load_persisted(self, cache_key: str, duration: int, parse=json.loads) -> bool:
+        """Seed the memory cache from disk on first use after a restart.
+        Stale entries are loaded too so they can serve as error fallbacks.
+        Returns True if the persisted response is still fresh: within the ttl it
+        was stored with, or within duration if it has none.
+        """
+        if not self.disk_cache or cache_key in self.cache:
+            return False
+        try:
+            entry = await self.disk_cache.load(cache_key)
+        except Exception as e:
+            print(f"  \u26a0 Could not read persisted {cache_key}: {e}")
+            return False
+        if entry is None:
+            return False
+        
+        body, fetched_at, ttl = entry
+        if ttl is not None:
+            duration = ttl
+        age = time.time() - fetched_at
+        self.cache.set(cache_key, parse(body), duration - age, size=len(body))
+        return age < duration
     
     async def get_sports(self) -> List[Dict]:
         """Fetch available sports from The Odds API (with caching)"""
         cache_key = 'sports_list'
-        now = datetime.now()
         
         # Check cache first
-        if cache_key in self.cache and cache_key in self.cache_expiry:
-            if now < self.cache_expiry[cache_key]:
-                print("Using cached sports list")
-                return self.cache[cache_key]
+        sports = self.cache.get(cache_key)
+        if sports is not None:
+            debug_log("Using cached sports list")
+            return sports
+        
+        if await self.load_persisted(cache_key, self.SPORTS_CACHE_DURATION, lambda body: self.select_sports(json.loads(body))):
+            print("Using persisted sports list")
+            return self.cache.peek(cache_key)
         
+        return await self.single_flight(cache_key, self._fetch_sports)
+    
+    async def _fetch_sports(self) -> List[Dict]:
+        """Fetch and filter the sports list from the API, updating the cache"""
+        cache_key = 'sports_list'
         try:
             print("Fetching sports list from API...")
             session = await self.get_session()
             url = f"{ODDS_API_BASE}/sports"
             params = {'apiKey': ODDS_API_KEY}
             
-            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                print(f"Sports API response status: {response.status}")
-                if response.status != 200:
-                    error_text = await response.text()
-                    print(f"Error fetching sports: HTTP {response.status} - {error_text}")
-                    # Return cached data if available, even if expired
-                    return self.cache.get(cache_key, [])
+            async with self.request_limiter:
+                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    print(f"Sports API response status: {response.status}")
+                    self.credits.update_usage(response.headers)
+                    if response.status != 200:
+                        error_text = await response.text()
+                        print(f"Error fetching sports: HTTP {response.status} - {error_text}")
+                        # Return cached data if available, even if expired
+                        return self.cache.get_stale(cache_key, [])
                 
-                sports = await response.json()
-                print(f"Fetched {len(sports)} total sports from API")
-                
-                # Filter out soccer and inactive sports
-                # Limit to popular Australian sports to reduce API calls
-                priority_sports = ['aussierules_afl', 'rugbyleague_nrl', 'basketball_nba', 'cricket_big_bash']
-                filtered_sports = []
-                
-                # First add priority sports if they're active
-                for sport in sports:
-                    if not sport.get('active', False):
-                        continue
-                    if self.is_soccer_related(sport.get('title', '')):
-                        continue
-                    if is_baseball_sport(sport.get('key', '')):
-                        continue
-                    if is_boxing_sport(sport.get('key', '')):
-                        continue
-                    if sport.get('key') in priority_sports:
-                        filtered_sports.append(sport)
-                        print(f"  \u2713 Added priority sport: {sport.get('title')}")
-
-                # Then add other sports up to limit of 10
-                for sport in sports:
-                    if len(filtered_sports) >= 10:
-                        break
-                    if not sport.get('active', False):
-                        continue
-                    if self.is_soccer_related(sport.get('title', '')):
-                        continue
-                    if is_baseball_sport(sport.get('key', '')):
-                        continue
-                    if is_boxing_sport(sport.get('key', '')):
-                        continue
-                    if sport not in filtered_sports:
-                        filtered_sports.append(sport)
-                        print(f"  \u2713 Added sport: {sport.get('title')}")
+                    body = await response.text()
+                    sports = json.loads(body)
+                    print(f"Fetched {len(sports)} total sports from API")
+                    await self.persist_response(cache_key, body)
                 
-                print(f"Filtered to {len(filtered_sports)} sports for scanning")
+                    # Cache the results
+                    result = self.select_sports(sports)
+                    self.cache.set(cache_key, result, self.SPORTS_CACHE_DURATION, size=len(body))
                 
-                # Cache the results
-                result = filtered_sports[:10]
-                self.cache[cache_key] = result
-                self.cache_expiry[cache_key] = now + timedelta(seconds=self.SPORTS_CACHE_DURATION)
-                
-                return result  # Hard limit to prevent too many API calls
+                    return result
         except Exception as e:
             print(f"Error fetching sports: {e}")
             import traceback
             traceback.print_exc()
             return []
     
+    def select_sports(self, sports: List[Dict]) -> List[Dict]:
+        """Pick up to 10 active, non-soccer/baseball/boxing sports, priority sports first"""
+        # Filter out soccer and inactive sports
+        # Limit to popular Australian sports to reduce API calls
+        priority_sports = ['aussierules_afl', 'rugbyleague_nrl', 'basketball_nba', 'cricket_big_bash']
+        filtered_sports = []
+    
+        # First add priority sports if they're active
+        for sport in sports:
+            if not sport.get('active', False):
+                continue
+            if is_excluded_sport(sport.get('key', ''), sport.get('title', '')):
+                continue
+            if sport.get('key') in priority_sports:
+                filtered_sports.append(sport)
+                debug_log(f"  \u2713 Added priority sport: {sport.get('title')}")
+
+        # Then add other sports up to limit of 10
+        for sport in sports:
+            if len(filtered_sports) >= 10:
+                break
+            if not sport.get('active', False):
+                continue
+            if is_excluded_sport(sport.get('key', ''), sport.get('title', '')):
+                continue
+            if sport not in filtered_sports:
+                filtered_sports.append(sport)
+                debug_log(f"  \u2713 Added sport: {sport.get('title')}")
+        
+        print(f"Filtered to {len(filtered_sports)} sports for scanning")
+        return filtered_sports[:10]  # Hard limit to prevent too many API calls
+    
     async def get_odds(self, sport_key: str, markets: str) -> List[Dict]:
         """Fetch odds for a specific sport and market (with caching)"""
         cache_key = f'odds_{sport_key}_{markets}'
-        now = datetime.now()
         
         # Check cache first
-        if cache_key in self.cache and cache_key in self.cache_expiry:
-            if now < self.cache_expiry[cache_key]:
-                cached_data = self.cache[cache_key]
-                print(f"  \u2192 Using cached {len(cached_data)} events for {sport_key}/{markets}")
-                return cached_data
+        cached_data = self.cache.get(cache_key)
+        if cached_data is not None:
+            metrics.inc('odds_cache_total', result='hit')
+            debug_log(f"  \u2192 Using cached {len(cached_data)} events for {sport_key}/{markets}")
+            return cached_data
+        
+        if await self.load_persisted(cache_key, self.ODDS_CACHE_DURATION):
+            cached_data = self.cache.peek(cache_key)
+            metrics.inc('odds_cache_total', result='persisted')
+            debug_log(f"  \u2192 Using persisted {len(cached_data)} events for {sport_key}/{markets}")
+            return cached_data
         
+        metrics.inc('odds_cache_total', result='miss')
+        return await self.single_flight(cache_key, lambda: self._fetch_odds(sport_key, markets))
+    
+    async def _fetch_odds(self, sport_key: str, markets: str) -> List[Dict]:
+        """Fetch odds for a sport and market from the API, updating the cache"""
+        cache_key = f'odds_{sport_key}_{markets}'
         try:
             session = await self.get_session()
             url = f"{ODDS_API_BASE}/sports/{sport_key}/odds"
@@ -308,173 +1973,319 @@ class ArbitrageBot:
                 'bookmakers': ','.join(SUPPORTED_BOOKMAKERS)
             }
             
-            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 401:
-                    print(f"  \u26a0 API key unauthorized for {sport_key}/{markets}")
-                    return self.cache.get(cache_key, [])
-                elif response.status == 422:
-                    # Market not available for this sport, cache empty result
-                    self.cache[cache_key] = []
-                    self.cache_expiry[cache_key] = now + timedelta(seconds=self.ODDS_CACHE_DURATION)
-                    return []
-                elif response.status != 200:
-                    error_text = await response.text()
-                    print(f"  \u26a0 Error fetching odds for {sport_key}/{markets}: HTTP {response.status}")
-                    return self.cache.get(cache_key, [])
+            async with self.request_limiter:
+                started = time.perf_counter()
+                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    self.credits.update_usage(response.headers)
+                    if response.status == 401:
+                        print(f"  \u26a0 API key unauthorized for {sport_key}/{markets}")
+                        return self.odds_fallback(cache_key, sport_key, 'unauthorized')
+                    elif response.status == 422:
+                        # Market not available for this sport, cache empty result
+                        self.credits.record_events(sport_key, [])
+                        interval = self.credits.interval_for(sport_key)
+                        self.cache.set(cache_key, [], interval, size=2)
+                        await self.persist_response(cache_key, '[]', interval)
+                        return []
+                    elif response.status != 200:
+                        error_text = await response.text()
+                        print(f"  \u26a0 Error fetching odds for {sport_key}/{markets}: HTTP {response.status}")
+                        return self.odds_fallback(cache_key, sport_key, f'http_{response.status}')
                 
-                events = await response.json()
-                print(f"  \u2192 Fetched {len(events)} events for {sport_key}/{markets}")
+                    # Hash the raw body as it streams in; it's only decoded if it changed
+                    hasher = hashlib.blake2b(digest_size=16)
+                    chunks = []
+                    size = 0
+                    async for chunk in response.content.iter_chunked(65536):
+                        hasher.update(chunk)
+                        chunks.append(chunk)
+                        size += len(chunk)
+                    metrics.observe('odds_fetch_seconds', time.perf_counter() - started, sport=sport_key)
+                    
+                    digest = hasher.digest()
+                    unchanged = digest == self.body_hashes.get(cache_key) and cache_key in self.cache
+                    if unchanged:
+                        # Unchanged body: hand back the same list, which tells
+                        # the extractor there's nothing to redo
+                        events = self.cache.peek(cache_key)
+                        debug_log(f"  \u2192 Unchanged {len(events)} events for {sport_key}/{markets}")
+                    else:
+                        # Decode off the event loop so a big body doesn't stall the gateway
+                        self.body_hashes[cache_key] = digest
+                        events, count = await asyncio.to_thread(self.decode_odds, chunks, datetime.now().astimezone())
+                        debug_log(f"  \u2192 Fetched {len(events)} of {count} events for {sport_key}/{markets}")
                 
-                # Cache the results
-                self.cache[cache_key] = events
-                self.cache_expiry[cache_key] = now + timedelta(seconds=self.ODDS_CACHE_DURATION)
+                    # Cache the results until the scheduler says this sport is due again
+                    self.credits.record_events(sport_key, events)
+                    interval = self.credits.interval_for(sport_key)
+                    self.cache.set(cache_key, events, interval, size=size)
+                    if self.disk_cache:
+                        # Store the interval too, so a restart doesn't re-buy sports the scheduler idled
+                        body = None if unchanged else json.dumps(events, separators=(',', ':'))
+                        await self.persist_response(cache_key, body, interval)
                 
-                return events
+                    return events
         except asyncio.TimeoutError:
             print(f"  \u26a0 Timeout fetching odds for {sport_key}/{markets}")
-            return self.cache.get(cache_key, [])
+            return self.odds_fallback(cache_key, sport_key, 'timeout')
         except Exception as e:
             print(f"  \u26a0 Error fetching odds for {sport_key}/{markets}: {e}")
-            return self.cache.get(cache_key, [])
+            return self.odds_fallback(cache_key, sport_key, 'error')
+    
+    def decode_odds(self, chunks: List[bytes], now_aware: datetime) -> tuple:
+        """Decode a buffered odds body element by element, keeping only what the
+        extractor needs. Returns (trimmed events, events in the body). Runs in a thread.
+        """
+        stream = JsonArrayStream()
+        events = []
+        for chunk in chunks:
+            for event in stream.feed(chunk):
+                event = self.trim_event(event, now_aware)
+                if event is not None:
+                    events.append(event)
+        stream.close()
+        return events, stream.count
+    
+    def odds_fallback(self, cache_key: str, sport_key: str, reason: str) -> List[Dict]:
+        """Serve the last odds we had after a failed fetch, if within the stale window"""
+        metrics.inc('odds_fetch_errors_total', sport=sport_key, reason=reason)
+        events = self.cache.get_stale(cache_key)
+        if events is None:
+            return []
+        metrics.inc('odds_cache_total', result='stale')
+        return events
+    
+    def trim_event(self, event: Dict, now_aware: datetime) -> Optional[Dict]:
+        """Reduce a raw API event to the fields extraction uses.
+        Returns None for events the extractor would skip: started or more than
+        7 days out, soccer matchups, or no 2-way markets.
+        """
+        try:
+            commence_time = parse_commence_time(event['commence_time'])
+        except (KeyError, AttributeError, TypeError, ValueError):
+            return None
+        if commence_time <= now_aware or commence_time > now_aware + timedelta(days=7):
+            return None
+        
+        home_team = event.get('home_team', '')
+        away_team = event.get('away_team', '')
+        if self.is_soccer_related(home_team) or self.is_soccer_related(away_team):
+            return None
+        
+        bookmakers = []
+        for bookmaker in event.get('bookmakers', []):
+            markets = [
+                {
+                    'key': market['key'],
+                    'outcomes': [
+                        {'name': outcome['name'], 'price': outcome['price'], 'point': outcome.get('point')}
+                        for outcome in market['outcomes']
+                    ],
+                }
+                for market in bookmaker.get('markets', [])
+                if len(market.get('outcomes', [])) == 2
+            ]
+            if markets:
+                bookmakers.append({'key': bookmaker['key'], 'last_update': bookmaker.get('last_update'), 'markets': markets})
+        if not bookmakers:
+            return None
+        
+        return {
+            'id': event.get('id'),
+            'commence_time': event['commence_time'],
+            'home_team': home_team,
+            'away_team': away_team,
+            'bookmakers': bookmakers,
+        }
     
-    async def fetch_all_opportunities_cached(self) -> List[Dict]:
+    async def fetch_all_opportunities_cached(self) -> OpportunitySnapshot:
         """Fetch all odds data once and extract all possible opportunities.
         This dramatically reduces API calls by fetching once and reusing for all queue items.
+        Concurrent callers share a single in-flight refresh.
+        """
+        return await self.single_flight('all_opportunities', self._refresh_opportunities)
+    
+    async def _refresh_opportunities(self) -> OpportunitySnapshot:
+        """Run one fetch-and-extract pass over all sports.
+        Only events whose bookmaker odds changed since the last pass are
+        re-extracted; the previous snapshot is patched with the difference.
         """
         print("\n" + "="*60)
         print("Fetching all opportunities (single API batch)")
         print("="*60)
+        refresh_started = time.perf_counter()
         
-        all_opportunities = []
         sports = await self.get_sports()
         if not sports:
             print("❌ No sports available")
-            return []
+            return OpportunitySnapshot([])
         
         # Fetch h2h,spreads,totals in ONE call per sport (saves 2 API calls per sport)
-        markets_combined = 'h2h,spreads,totals'
+        now_aware = datetime.now().astimezone()
         
-        for sport in sports:
-            sport_key = sport['key']
-            sport_title = sport['title']
-            print(f"\n📊 Fetching {sport_title}...")
-            
-            events = await self.get_odds(sport_key, markets_combined)
-            
+        async def fetch_sport(sport: Dict):
+            debug_log(f"\n📊 Fetching {sport['title']}...")
+            events = await self.get_odds(sport['key'], ODDS_MARKETS)
+            if self.history and events is not self.history_recorded.get(sport['key']):
+                # Cached and unchanged responses come back as the same list, so only new odds are logged
+                self.history_recorded[sport['key']] = events
+                await self.record_history(sport, events)
+            extract_started = time.perf_counter()
+            sport_removed, sport_added, state = await self.update_sport_extraction(sport['key'], sport['title'], events, now_aware)
+            metrics.observe('extraction_seconds', time.perf_counter() - extract_started, sport=sport['key'])
+            return sport, sport_removed, sport_added, state
+        
+        removed_events = set()
+        added = []
+        # New per-sport extraction state, only kept once the snapshot it feeds is
+        # published: if any sport fails, every sport is diffed against the old state next time
+        states = {}
+        
+        # Requests run concurrently under self.request_limiter; each sport is
+        # extracted (on the extraction pool) as soon as its response arrives
+        # and streamed to any progressive searches waiting on this refresh
+        tasks = [asyncio.create_task(fetch_sport(sport)) for sport in sports]
+        progress = self.refresh_progress = {'done': 0, 'total': len(tasks), 'added': added}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                sport, sport_removed, sport_added, state = await next_done
+                states[sport['key']] = state
+                removed_events |= sport_removed
+                added.extend(sport_added)
+                progress['done'] += 1
+                for listener in self.progress_listeners:
+                    listener.put_nowait((progress['done'], progress['total'], sport_added))
+        finally:
+            self.refresh_progress = None
+        
+        # Sports that dropped out of the sports list take their events with them
+        dropped = [sport_key for sport_key in self.sport_extractions if sport_key not in states]
+        for sport_key in dropped:
+            removed_events |= self.sport_extractions[sport_key]['active']
+        
+        changed = self.snapshot is None or removed_events or added
+        if not changed:
+            # Nothing changed: keep the current version, so its age reflects the
+            # odds and queued searches aren't re-matched against the same data
+            snapshot = self.snapshot
+            print(f"\n✅ No odds changes - keeping snapshot v{snapshot.version} ({len(snapshot)} potential opportunities)")
+        else:
+            # Publish a new version; readers holding the old snapshot are unaffected
+            previous = self.snapshot or OpportunitySnapshot([], version=self.version_floor)
+            snapshot = previous.patched(removed_events, added, version=previous.version + 1)
+            print(f"\n✅ {len(snapshot)} potential opportunities ({len(added)} re-extracted, {len(removed_events)} events replaced or dropped)")
+            self.publish_snapshot(snapshot)
+        
+        self.sport_extractions.update(states)
+        for sport_key in dropped:
+            del self.sport_extractions[sport_key]
+        if self.role == 'fetcher' and changed:
+            await self.write_snapshot(snapshot)
+        self.last_full_fetch = datetime.now()
+        metrics.observe('refresh_seconds', time.perf_counter() - refresh_started)
+        return snapshot
+    
+    async def record_history(self, sport: Dict, events: List[Dict]):
+        """Append a sport's newly fetched events to the history log"""
+        try:
+            await asyncio.to_thread(self.history.append, time.time(), sport['key'], sport['title'], events)
+        except Exception as e:
+            print(f"  \u26a0 Could not record history for {sport['key']}: {e}")
+    
+    async def update_sport_extraction(self, sport_key: str, sport_title: str, events: List[Dict], now_aware: datetime) -> tuple:
+        """Diff one sport's events against the previous pass.
+        Returns (ids of events to drop from the snapshot, opportunities to add,
+        the sport's new extraction state). The state in self.sport_extractions
+        isn't touched; the caller stores the new one once the diff is published.
+        Events are re-extracted (on self.extractor) only when their start time
+        or their bookmakers' last_update values change.
+        """
+        state = self.sport_extractions.get(sport_key) or {'events': None, 'entries': {}, 'active': set()}
+        entries = state['entries']
+        changed = set()
+        
+        # An unchanged response body comes back as the same cached list
+        if events is not state['events']:
+            current = {}
+            jobs = []
+            signatures = {}
             for event in events:
-                # Filter out live/in-play events (already started)
-                try:
-                    commence_time = datetime.fromisoformat(event['commence_time'].replace('Z', '+00:00'))
-                    now_aware = datetime.now().astimezone()
-                    if commence_time <= now_aware:
-                        continue  # Skip live/in-play games
-                    if commence_time > now_aware + timedelta(days=7):
-                        continue
-                except:
-                    continue
-                
-                home_team = event.get('home_team', '')
-                away_team = event.get('away_team', '')
-                
-                if self.is_soccer_related(home_team) or self.is_soccer_related(away_team):
-                    continue
-                
-                bookmakers = event.get('bookmakers', [])
-                
-                # Extract all 2-way opportunities from this event
-                for bookmaker in bookmakers:
-                    bookmaker_key = bookmaker['key']
-                    
-                    for market in bookmaker.get('markets', []):
-                        market_type = market['key']
-                        outcomes = market.get('outcomes', [])
-                        
-                        if len(outcomes) != 2:  # Only 2-way markets
-                            continue
-                        
-                        for i, bonus_outcome in enumerate(outcomes):
-                            hedge_outcome = outcomes[1 - i]
-                            bonus_odds = bonus_outcome['price']
-                            
-                            # Find best hedge odds from other bookmakers
-                            best_hedge_odds = 0
-                            best_hedge_bookmaker = None
-                            
-                            for other_bookmaker in bookmakers:
-                                if other_bookmaker['key'] == bookmaker_key:
-                                    continue
-                                
-                                for other_market in other_bookmaker.get('markets', []):
-                                    if other_market['key'] != market_type:
-                                        continue
-                                    
-                                    for outcome in other_market.get('outcomes', []):
-                                        if outcome['name'] == hedge_outcome['name']:
-                                            if outcome['price'] > best_hedge_odds:
-                                                best_hedge_odds = outcome['price']
-                                                best_hedge_bookmaker = other_bookmaker['key']
-                            
-                            if not best_hedge_bookmaker or best_hedge_odds == 0:
-                                continue
-                            
-                            market_display = {
-                                'h2h': 'Head to Head',
-                                'spreads': 'Spread',
-                                'totals': 'Totals'
-                            }.get(market_type, market_type)
-                            
-                            all_opportunities.append({
-                                'sport_title': sport_title,
-                                'home_team': home_team,
-                                'away_team': away_team,
-                                'market_type': market_type,
-                                'market_display': market_display,
-                                'bonus_bookmaker': bookmaker_key,
-                                'bonus_outcome': bonus_outcome['name'],
-                                'bonus_odds_decimal': bonus_odds,
-                                'hedge_bookmaker': best_hedge_bookmaker,
-                                'hedge_outcome': hedge_outcome['name'],
-                                'hedge_odds_decimal': best_hedge_odds,
-                            })
+                event_id = event.get('id') or f"{event.get('home_team')}|{event.get('away_team')}|{event.get('commence_time')}"
+                signature = (
+                    event.get('commence_time'),
+                    tuple((bookmaker['key'], bookmaker.get('last_update')) for bookmaker in event.get('bookmakers', [])),
+                )
+                entry = entries.get(event_id)
+                if entry is None or entry['signature'] != signature:
+                    jobs.append((event_id, event))
+                    signatures[event_id] = (signature, event)
+                else:
+                    current[event_id] = entry
             
-            # Small delay between sports to be nice to the API
-            await asyncio.sleep(0.3)
+            for event_id, commence_time, rows in await self.extractor.run(jobs):
+                signature, event = signatures[event_id]
+                current[event_id] = self.build_entry(event_id, sport_title, event, signature, commence_time, rows)
+                changed.add(event_id)
+            entries = current
         
-        print(f"\n✅ Extracted {len(all_opportunities)} potential opportunities")
-        return all_opportunities
+        # Only upcoming events within the next 7 days go into the snapshot
+        horizon = now_aware + timedelta(days=7)
+        active = {
+            event_id for event_id, entry in entries.items()
+            if entry['opportunities'] and now_aware < entry['commence_time'] <= horizon
+        }
+        previous_active = state['active']
+        
+        removed = (previous_active - active) | (previous_active & changed)
+        added = [
+            opp
+            for event_id in (active - previous_active) | (active & changed)
+            for opp in entries[event_id]['opportunities']
+        ]
+        return removed, added, {'events': events, 'entries': entries, 'active': active}
     
-    def find_opportunity_from_cache(self, all_opportunities: List[Dict], selected_bookmaker: str, amount: float, search_mode: str = 'best') -> Optional[Dict]:
+    def build_entry(self, event_id: str, sport_title: str, event: Dict, signature: tuple,
+                    commence_time: Optional[datetime], rows: tuple) -> Dict:
+        """Turn extract_events() output for one event into its extraction entry"""
+        if not rows:
+            return {'signature': signature, 'commence_time': commence_time, 'opportunities': []}
+        event_info = EventInfo(event_id, sport_title, event.get('home_team', ''), event.get('away_team', ''), commence_time)
+        return {
+            'signature': signature,
+            'commence_time': commence_time,
+            'opportunities': [Opportunity(event_info, *row) for row in rows],
+        }
+    
+    def find_opportunity_from_cache(self, snapshot: OpportunitySnapshot, selected_bookmaker: str, amount: float, search_mode: str = 'best') -> Optional[Dict]:
         """Find the best opportunity for a specific bookmaker from pre-fetched data.
-        This uses NO API calls - just filters the cached opportunities.
+        This uses NO API calls - just looks up the bookmaker's pre-ranked opportunities.
         """
-        best_opportunity = None
-        best_return = float('-inf')
-        quick_threshold = amount * 0.60  # 60% minimum for quick mode
-        
-        for opp in all_opportunities:
-            if opp['bonus_bookmaker'] != selected_bookmaker:
-                continue
-            
-            # Calculate returns for this amount
-            calc = self.calculate_bonus_bet_opportunity(
-                opp['bonus_odds_decimal'],
-                opp['hedge_odds_decimal'],
-                amount
-            )
-            
-            if calc['guaranteed_return'] > best_return:
-                best_return = calc['guaranteed_return']
-                best_opportunity = {
-                    **opp,
-                    'bonus_amount': amount,
-                    **calc
-                }
-                
-                # In quick mode, return first opportunity that meets threshold
-                if search_mode == 'quick' and calc['guaranteed_return'] >= quick_threshold:
-                    return best_opportunity
+        ranked = snapshot.by_bookmaker.get(selected_bookmaker)
+        if not ranked:
+            return None
         
-        return best_opportunity
+        # The ranking doesn't depend on the amount, so the head of the list is
+        # both the best return ('best' mode) and the first opportunity to clear
+        # the 60% threshold ('quick' mode) when any does. Skip events that have
+        # started since the snapshot was built.
+        now_aware = datetime.now().astimezone()
+        opp = next((opp for opp in ranked if opp.event.commence_time > now_aware), None)
+        if opp is None:
+            return None
+        return self.build_opportunity(opp, amount)
+    
+    def build_opportunity(self, opp: Opportunity, amount: float) -> Dict:
+        """Materialize a ranked opportunity as a dict with the returns for a specific bonus amount"""
+        calc = self.calculate_bonus_bet_opportunity(
+            opp.bonus_odds,
+            opp.hedge_odds,
+            amount
+        )
+        return {
+            **opp.to_dict(),
+            'bonus_amount': amount,
+            **calc
+        }
     
     def calculate_bonus_bet_opportunity(self, bonus_odds: float, hedge_odds: float, amount: float) -> Dict:
         """Calculate the returns for a bonus bet opportunity"""
@@ -505,7 +2316,8 @@ class ArbitrageBot:
     async def find_best_opportunity(self, selected_bookmaker: str, amount: float, search_mode: str = 'best') -> Optional[Dict]:
         """Find the single best 2-way opportunity for the selected bookmaker
         
-        Uses combined market fetch to minimize API calls (1 call per sport instead of 3).
+        Answers from the latest background snapshot, so no API calls are made
+        on the interactive path unless nothing has been fetched yet.
         
         Args:
             selected_bookmaker: The bookmaker where the bonus bet will be placed
@@ -516,16 +2328,20 @@ class ArbitrageBot:
         print(f"Starting search for {selected_bookmaker} - ${amount} ({search_mode} mode)")
         print(f"{'='*60}")
         
-        # Use the batch fetch and filter approach to minimize API calls
-        all_opportunities = await self.fetch_all_opportunities_cached()
+        # Answer from the current snapshot; only a cold start waits for a fetch
+        snapshot = self.get_snapshot()
+        if snapshot is None and self.role == 'frontend':
+            snapshot = await self.wait_for_snapshot(0, timeout=30)
+        elif snapshot is None:
+            snapshot = await self.fetch_all_opportunities_cached()
         
-        if not all_opportunities:
+        if not snapshot:
             print("❌ No opportunities available")
             return None
         
         # Find best opportunity from the fetched data
         best_opportunity = self.find_opportunity_from_cache(
-            all_opportunities, 
+            snapshot, 
             selected_bookmaker, 
             amount, 
             search_mode
@@ -538,6 +2354,61 @@ class ArbitrageBot:
         
         return best_opportunity
 
+    async def find_best_opportunity_progressive(self, selected_bookmaker: str, amount: float, search_mode: str,
+                                                on_update, deadline: float = SEARCH_DEADLINE) -> Optional[Dict]:
+        """find_best_opportunity for interactive searches that can't wait for a cold fetch.
+        
+        With a snapshot available this answers from it immediately. Otherwise
+        it follows the refresh as each sport is extracted, awaiting
+        on_update(opportunity, sports_done, sports_total) whenever the best so
+        far improves, and returns the best found by the deadline (seconds).
+        Quick mode returns as soon as an opportunity clears QUICK_RETURN_THRESHOLD.
+        """
+        if self.get_snapshot() is not None or self.role == 'frontend':
+            return await self.find_best_opportunity(selected_bookmaker, amount, search_mode)
+        
+        print(f"Cold start - streaming results for {selected_bookmaker} - ${amount} ({search_mode} mode)")
+        updates = asyncio.Queue()
+        refresh = self.start_single_flight('all_opportunities', self._refresh_opportunities)
+        # Catch up on sports this refresh finished before we subscribed
+        progress = self.refresh_progress
+        if progress and progress['added']:
+            updates.put_nowait((progress['done'], progress['total'], list(progress['added'])))
+        self.progress_listeners.add(updates)
+        refresh.add_done_callback(lambda _: updates.put_nowait(None))
+        
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        best = None
+        try:
+            while True:
+                try:
+                    update = await asyncio.wait_for(updates.get(), end - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if update is None:
+                    # Refresh finished: the published snapshot has the full ranking
+                    if self.snapshot is not None:
+                        return self.find_opportunity_from_cache(self.snapshot, selected_bookmaker, amount, search_mode)
+                    break
+                
+                done, total, added = update
+                now_aware = datetime.now().astimezone()
+                candidate = max(
+                    (opp for opp in added if opp.bonus_bookmaker == selected_bookmaker and opp.event.commence_time > now_aware),
+                    key=rank_key, default=None
+                )
+                if candidate is None or (best is not None and candidate.return_ratio <= best.return_ratio):
+                    continue
+                best = candidate
+                if search_mode == 'quick' and best.return_ratio >= QUICK_RETURN_THRESHOLD:
+                    break
+                await on_update(self.build_opportunity(best, amount), done, total)
+        finally:
+            self.progress_listeners.discard(updates)
+        
+        return self.build_opportunity(best, amount) if best else None
+    
     def create_opportunity_embed(self, opportunity: Dict, search_mode: str = 'best') -> discord.Embed:
         mode_emoji = "⚡" if search_mode == "quick" else "🏆"
         mode_text = "Quick Return" if search_mode == "quick" else "Best Return"
@@ -620,20 +2491,82 @@ class SearchModeView(discord.ui.View):
         select.callback = self.select_callback
         self.add_item(select)
     
+    def queued_embed(self, reason: str, mode_text: str, updated: bool) -> discord.Embed:
+        embed = discord.Embed(
+            title="⏰ Updated Your Queued Search" if updated else "⏰ Added to Search Queue",
+            description=(
+                f"{reason}\n\n"
+                f"**Don't worry!** I'll keep searching for you:\n"
+                f"• Checked against **every odds update** (as often as every minute)\n"
+                f"• You'll be **@mentioned** when found\n"
+                f"• Search expires after **24 hours**\n\n"
+                f"**Your search:**\n"
+                f"💰 Amount: ${self.amount:,.0f}\n"
+                f"📱 Bookmaker: {self.bookmaker.title()}\n"
+                f"⚙️ Mode: {mode_text}"
+            ),
+            color=0xffa500
+        )
+        embed.set_footer(text="You can close this message - I'll ping you when ready!")
+        return embed
+    
     async def select_callback(self, interaction: discord.Interaction):
         search_mode = interaction.data['values'][0]
-        
         mode_text = "**Quick Return**" if search_mode == "quick" else "**Best Return Possible**"
+        
+        # Admission control: rate-limit each user, and queue instead of searching live when busy
+        search_key = (self.user_id, self.bookmaker, search_mode)
+        admission = arb_bot.admission.admit(search_key)
+        if admission == 'duplicate':
+            embed = discord.Embed(
+                title="🔍 Already Searching",
+                description=f"Your {mode_text} search on **{self.bookmaker.title()}** is still running - the result will appear there.",
+                color=0xffaa00
+            )
+            await interaction.response.edit_message(embed=embed, view=None)
+            return
+        if admission == 'limited':
+            embed = discord.Embed(
+                title="🐢 Slow Down",
+                description=f"You're searching too often. Please try again in **{arb_bot.admission.retry_after(self.user_id):.0f}s**.",
+                color=0xff0000
+            )
+            await interaction.response.edit_message(embed=embed, view=None)
+            return
+        if admission == 'queued':
+            added = await arb_bot.add_to_queue(
+                self.user_id, self.user_mention, self.amount, self.bookmaker, search_mode, interaction
+            )
+            reason = f"Live searches are busy right now, so I've queued your search for **{self.bookmaker.title()}**."
+            await interaction.response.edit_message(embed=self.queued_embed(reason, mode_text, not added), view=None)
+            return
+        
         loading_embed = discord.Embed(
             title="🔍 Searching for Opportunity...",
             description=f"Mode: {mode_text}\nBookmaker: **{self.bookmaker.title()}**\nAmount: **${self.amount:,.0f}**\n\n⏳ Searching now...",
             color=0xffaa00
         )
-        await interaction.response.edit_message(embed=loading_embed, view=None)
+        try:
+            await interaction.response.edit_message(embed=loading_embed, view=None)
+        except BaseException:
+            arb_bot.admission.release(search_key)
+            raise
+        
+        last_edit = 0.0
+        
+        async def show_progress(opportunity: Dict, done: int, total: int):
+            """Show the best so far while slower sports are still loading"""
+            nonlocal last_edit
+            if time.monotonic() - last_edit < SEARCH_EDIT_INTERVAL:
+                return
+            last_edit = time.monotonic()
+            embed = arb_bot.create_opportunity_embed(opportunity, search_mode)
+            embed.set_footer(text=f"⏳ Best so far - checked {done}/{total} sports, still searching...")
+            await interaction.edit_original_response(embed=embed)
         
         try:
             # Try to find immediately first
-            opportunity = await arb_bot.find_best_opportunity(self.bookmaker, self.amount, search_mode)
+            opportunity = await arb_bot.find_best_opportunity_progressive(self.bookmaker, self.amount, search_mode, show_progress)
             
             if opportunity:
                 # Found immediately!
@@ -642,7 +2575,7 @@ class SearchModeView(discord.ui.View):
                 await interaction.edit_original_response(embed=embed)
             else:
                 # Not found - add to queue for continuous searching
-                await arb_bot.add_to_queue(
+                added = await arb_bot.add_to_queue(
                     self.user_id,
                     self.user_mention,
                     self.amount,
@@ -650,24 +2583,8 @@ class SearchModeView(discord.ui.View):
                     search_mode,
                     interaction
                 )
-                
-                queued_embed = discord.Embed(
-                    title="⏰ Added to Search Queue",
-                    description=(
-                        f"No immediate opportunity found for **{self.bookmaker.title()}**.\n\n"
-                        f"**Don't worry!** I'll keep searching for you:\n"
-                        f"• Checking every **15 minutes**\n"
-                        f"• You'll be **@mentioned** when found\n"
-                        f"• Search expires after **24 hours**\n\n"
-                        f"**Your search:**\n"
-                        f"💰 Amount: ${self.amount:,.0f}\n"
-                        f"📱 Bookmaker: {self.bookmaker.title()}\n"
-                        f"⚙️ Mode: {mode_text}"
-                    ),
-                    color=0xffa500
-                )
-                queued_embed.set_footer(text="You can close this message - I'll ping you when ready!")
-                await interaction.edit_original_response(embed=queued_embed)
+                reason = f"No immediate opportunity found for **{self.bookmaker.title()}**."
+                await interaction.edit_original_response(embed=self.queued_embed(reason, mode_text, not added))
                 
         except Exception as e:
             print(f"Error in bonus bet generation: {e}")
@@ -677,6 +2594,8 @@ class SearchModeView(discord.ui.View):
                 color=0xff0000
             )
             await interaction.edit_original_response(embed=error_embed)
+        finally:
+            arb_bot.admission.release(search_key)
 
 class BookmakerSelectView(discord.ui.View):
     def __init__(self, amount: float):
@@ -781,40 +2700,74 @@ class PersistentView(discord.ui.View):
 
 @bot.event
 async def on_ready():
-    print(f'{bot.user} has logged in!')
-    bot.add_view(PersistentView())
+    # on_ready fires again after every gateway reconnect; one-time setup runs once
+    if arb_bot.connected_once:
+        print(f'{bot.user} reconnected')
+    else:
+        arb_bot.connected_once = True
+        print(f'{bot.user} has logged in!')
+        bot.add_view(PersistentView())
+        # Replay persisted searches before the queue processor starts
+        await arb_bot.restore_queue()
+        await arb_bot.start_metrics_server()
     
-    # Start the queue processor
+    # Start (or restart, if they've stopped) the notification workers,
+    # snapshot refresher and queue processor
+    arb_bot.notifier.start()
+    arb_bot.start_background_refresh()
     if not arb_bot.search_task or arb_bot.search_task.done():
         arb_bot.search_task = bot.loop.create_task(arb_bot.process_queue())
         print("Started background queue processor")
+    
+    try:
+        await arb_bot.ensure_interface()
+    except Exception as e:
+        print(f"Error setting up channel interface: {e}")
 
-    if CHANNEL_ID:
-        try:
-            channel = bot.get_channel(CHANNEL_ID)
-            if channel:
-                async for message in channel.history(limit=50):
-                    if message.author == bot.user and message.embeds:
-                        embed = message.embeds[0]
-                        if "Want to use your bonus bet smart" in embed.title:
-                            await message.edit(embed=create_interface_embed(), view=PersistentView())
-                            return
-                embed = create_interface_embed()
-                view = PersistentView()
-                await channel.send(embed=embed, view=view)
-        except Exception as e:
-            print(f"Error setting up channel interface: {e}")
+async def run_bot():
+    """Log in to Discord while the first odds snapshot loads in the background"""
+    discord.utils.setup_logging()
+    try:
+        async with bot:
+            arb_bot.start_background_refresh()
+            await bot.start(DISCORD_TOKEN)
+    finally:
+        await arb_bot.close_session()
+
+@bot.command(name='metrics')
+@commands.has_permissions(administrator=True)
+async def metrics_command(ctx: commands.Context):
+    """Admin-only summary of refresh, cache, credit and queue metrics"""
+    await ctx.send(f"```\n{arb_bot.metrics_summary()}\n```")
 
 if __name__ == "__main__":
-    if not DISCORD_TOKEN or not ODDS_API_KEY:
+    if BOT_ROLE not in ('all', 'fetcher', 'frontend'):
+        print(f"Error: BOT_ROLE must be all, fetcher or frontend (got {BOT_ROLE})")
+    elif (SHARD_ID is None) != (SHARD_COUNT is None) or (SHARD_COUNT is not None and not 0 <= SHARD_ID < SHARD_COUNT):
+        print("Error: SHARD_ID and SHARD_COUNT must be set together, with 0 <= SHARD_ID < SHARD_COUNT")
+    elif BOT_ROLE == 'fetcher':
+        if not ODDS_API_KEY:
+            print("Error: Missing ODDS_API_KEY environment variable")
+        else:
+            print("Starting odds fetcher...")
+            try:
+                asyncio.run(arb_bot.run_fetcher())
+            except KeyboardInterrupt:
+                pass
+            finally:
+                arb_bot.extractor.shutdown()
+    elif not DISCORD_TOKEN or (not ODDS_API_KEY and BOT_ROLE != 'frontend'):
         print("Error: Missing DISCORD_TOKEN or ODDS_API_KEY environment variables")
     elif not CHANNEL_ID:
         print("Error: Missing CHANNEL_ID environment variable")
     else:
         print("Starting Discord 2-Way Bonus Bet Turnover Bot...")
         try:
-            bot.run(DISCORD_TOKEN)
+            asyncio.run(run_bot())
+        except KeyboardInterrupt:
+            pass
         finally:
             # Cleanup
-            if arb_bot.session and not arb_bot.session.closed:
-                asyncio.run(arb_bot.close_session())
+            if arb_bot.queue_store:
+                arb_bot.queue_store.flush()
+            arb_bot.extractor.shutdown()